@@ -16,6 +16,7 @@ __all__ = [
     'find_trapped_bonds',
     'find_trapped_sites',
     'find_connected_clusters',
+    'is_in_clusters',
 ]
 
 
@@ -122,11 +123,50 @@ def mixed_percolation(conns, occupied_sites, occupied_bonds):
     return s_labels, b_labels
 
 
+def is_in_clusters(labels, clusters):
+    r"""
+    Finds which of the given labels belong to any of the given clusters
+
+    Parameters
+    ----------
+    labels : ndarray
+        An array of cluster labels, with -1 indicating unoccupied
+    clusters : array_like
+        The cluster labels to look for. Negative values match the same
+        negative labels, so e.g. a ``-1`` cluster matches unoccupied entries.
+
+    Returns
+    -------
+    mask : ndarray
+        A boolean array the same shape as ``labels`` with ``True`` where
+        the label is one of the given ``clusters``.
+
+    Notes
+    -----
+    This is equivalent to ``np.isin(labels, clusters)`` but since cluster
+    labels are small dense integers it uses a boolean lookup array rather
+    than sorting and searching.
+
+    """
+    clusters = np.asarray(clusters, dtype=int)
+    N = max(np.amax(labels, initial=-1), np.amax(clusters, initial=-1))
+    # The extra trailing entry stays False and is what -1 labels look up
+    lookup = np.zeros(N + 2, dtype=bool)
+    lookup[clusters[clusters >= 0]] = True
+    mask = lookup[labels]
+    # Negative labels can't use the lookup, so match them the slow way
+    neg = clusters[clusters < 0]
+    if neg.size > 0:
+        unoccupied = labels < 0
+        mask[unoccupied] = np.isin(labels[unoccupied], neg)
+    return mask
+
+
 def find_connected_clusters(bond_labels, site_labels, inlets, asmask=True):
     hits = np.unique(site_labels[inlets])
     hits = hits[hits >= 0]
-    occupied_bonds = np.isin(bond_labels, hits)
-    occupied_sites = np.isin(site_labels, hits)
+    occupied_bonds = is_in_clusters(bond_labels, hits)
+    occupied_sites = is_in_clusters(site_labels, hits)
     if not asmask:
         occupied_bonds = occupied_bonds*(bond_labels + 1) - 1
         occupied_sites = occupied_sites*(site_labels + 1) - 1
@@ -188,8 +228,8 @@ def trim_disconnected_clusters(b_labels, s_labels, inlets):
     """
     hits = np.unique(s_labels[inlets])
     hits = hits[hits >= 0]
-    occupied_bonds = np.isin(b_labels, hits)
-    occupied_sites = np.isin(s_labels, hits)
+    occupied_bonds = is_in_clusters(b_labels, hits)
+    occupied_sites = is_in_clusters(s_labels, hits)
     return occupied_sites, occupied_bonds
 
 
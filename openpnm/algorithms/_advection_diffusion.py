@@ -98,10 +98,8 @@ class AdvectionDiffusion(ReactiveTransport):
         if 'pore.bc.outflow' not in self.keys():
             return
         # Apply outflow BC
-        diag = self.A.diagonal()
         ind = np.isfinite(self['pore.bc.outflow'])
-        diag[ind] += self['pore.bc.outflow'][ind]
-        self.A.setdiag(diag)
+        self.A.data[self._pattern['diag'][ind]] += self['pore.bc.outflow'][ind]
 
 
 if __name__ == "__main__":
@@ -8,6 +8,7 @@ from openpnm._skgraph.simulations import (
     site_percolation,
     mixed_percolation,
     find_connected_clusters,
+    is_in_clusters,
 )
 
 
@@ -167,8 +168,8 @@ class Drainage(Algorithm):
             b[Ts] = np.amax(s[self.network.conns], axis=1)[Ts]
             # Finally, mark pores and throats as trapped if their cluster
             # numbers are NOT connected to the outlets
-            self['pore.trapped'] += np.isin(s, clusters, invert=True)*(s >= 0)
-            self['throat.trapped'] += np.isin(b, clusters, invert=True)*(b >= 0)
+            self['pore.trapped'] += ~is_in_clusters(s, clusters)*(s >= 0)
+            self['throat.trapped'] += ~is_in_clusters(b, clusters)*(b >= 0)
         # Use the identified trapped pores and throats to update the other
         # data on the object accordingly
         # self['pore.trapped'][self['pore.residual']] = False
@@ -317,8 +318,8 @@ if __name__ == '__main__':
         clusters = np.unique(s[drn['pore.bc.outlet']])
         Ts = pn.find_neighbor_throats(pores=s >= 0)
         b[Ts] = np.amax(s[pn.conns], axis=1)[Ts]
-        drn['pore.trapped'] += np.isin(s, clusters, invert=True)*(s >= 0)
-        drn['throat.trapped'] += np.isin(b, clusters, invert=True)*(b >= 0)
+        drn['pore.trapped'] += ~is_in_clusters(s, clusters)*(s >= 0)
+        drn['throat.trapped'] += ~is_in_clusters(b, clusters)*(b >= 0)
         ax = op.topotools.plot_coordinates(pn, pores=drn['pore.trapped'],
                                            color_by=s)
         ax = op.topotools.plot_coordinates(pn, pores=pseq <= p, c='k', ax=ax)
@@ -6,6 +6,7 @@ from openpnm.utils import Docorator, TypedSet
 from openpnm._skgraph.simulations import (
     site_percolation,
     find_connected_clusters,
+    is_in_clusters,
 )
 
 
@@ -119,8 +120,8 @@ class Imbibition(Drainage):
             clusters = np.unique(s[self['pore.bc.outlet']])
             # Ts = self.network.find_neighbor_throats(pores=s >= 0)
             # b[Ts] = np.amax(s[self.network.conns], axis=1)[Ts]
-            self['pore.trapped'] += np.isin(s, clusters, invert=True)*(s >= 0)
-            self['throat.trapped'] += np.isin(b, clusters, invert=True)*(b >= 0)
+            self['pore.trapped'] += ~is_in_clusters(s, clusters)*(s >= 0)
+            self['throat.trapped'] += ~is_in_clusters(b, clusters)*(b >= 0)
         self['pore.invaded'][self['pore.trapped']] = False
         self['throat.invaded'][self['throat.trapped']] = False
         self['pore.invasion_pressure'][self['pore.trapped']] = -np.inf
@@ -10,6 +10,7 @@ from openpnm._skgraph.simulations import (
     bond_percolation,
     site_percolation,
     mixed_percolation,
+    is_in_clusters,
 )
 from openpnm._skgraph.queries import (
     qupc_initialize,
@@ -270,8 +271,8 @@ class InvasionPercolation(Algorithm):
                                          occupied_sites=pseq > i,
                                          occupied_bonds=tseq > i)
             clusters = np.unique(s[self['pore.bc.outlet']])
-            self['pore.trapped'] += np.isin(s, clusters, invert=True)*(pseq > i)
-            self['throat.trapped'] += np.isin(b, clusters, invert=True)*(tseq > i)
+            self['pore.trapped'] += ~is_in_clusters(s, clusters)*(pseq > i)
+            self['throat.trapped'] += ~is_in_clusters(b, clusters)*(tseq > i)
         # Set trapped pores/throats to uninvaded and adjust invasion sequence
         self['pore.invasion_sequence'][self['pore.trapped']] = -1
         self['throat.invasion_sequence'][self['throat.trapped']] = -1
@@ -1,5 +1,4 @@
 import logging
-import numpy as np
 from openpnm.algorithms import ReactiveTransport
 from openpnm.models.physics import source_terms as st
 from openpnm.utils import Docorator
@@ -49,8 +48,7 @@ class IonicConduction(ReactiveTransport):
     def _charge_conservation_eq_source_term(self, e_alg):
         # Source term for Poisson or charge conservation (electroneutrality) eq
         phase = self.project.phase()[self.settings['phase']]
-        Ps = (self['pore.all'] * np.isnan(self['pore.bc.value'])
-              * np.isnan(self['pore.bc.rate']))
+        Ps = self['pore.all'] & ~(self._bc_value_mask | self._bc_rate_mask)
         mod = st.charge_conservation
         phys = self.project.find_physics(phase=phase)
         phys[0].add_model(propname='pore.charge_conservation', model=mod,
@@ -139,9 +139,7 @@ class ReactiveTransport(Transport):
                 Ps = self['pore.source.' + item]
                 S1, S2 = [phase[f"pore.{item}.{Si}"] for Si in ["S1", "S2"]]
                 # Modify A and b: diag(A) += -S1, b += S2
-                diag = self.A.diagonal()
-                diag[Ps] += -S1[Ps]
-                self.A.setdiag(diag)
+                self.A.data[self._pattern['diag'][Ps]] -= S1[Ps]
                 self.b[Ps] += S2[Ps]
         except KeyError:
             pass
@@ -224,21 +222,26 @@ class ReactiveTransport(Transport):
         r"""
         Builds/updates A, b based on the recent solution on algorithm object.
         """
-        self._update_iterative_props()
+        iterative_props = self.iterative_props
+        self._update_iterative_props(iterative_props)
         super()._update_A_and_b()
         self._apply_sources()
+        # A and b depend on x if there are source terms or iterative props,
+        # in which case they must be rebuilt whenever x is updated
+        has_sources = any(k.startswith('pore.source.') for k in self.keys())
+        self._dirty = bool(iterative_props) or has_sources
 
     def _get_residual(self, x=None):
         r"""
         Calculates solution residual based on the given ``x`` based on the
         following formula:
 
-            ``R = A * x - b``
+            ``R = A.dot(x) - b``
 
         """
         if x is None:
             x = self.x
-        return self.A * x - self.b
+        return self.A.dot(x) - self.b
 
     def set_BC(self, pores=None, bctype=[], bcvalues=[], mode='add'):
         msg = "Source term already present in given pores, can't assign BCs"
@@ -114,7 +114,7 @@ class TransientReactiveTransport(ReactiveTransport):
             # TODO: add a cache mechanism
             self.x = y
             self._update_A_and_b()
-            A = self.A.tocsc()
+            A = self.A  # already CSR, so no conversion needed for A.dot
             b = self.b
             V = self.network[self.settings["pore_volume"]]
             return (-A.dot(y) + b) / V  # much faster than A*y
@@ -123,7 +123,7 @@ class TransientReactiveTransport(ReactiveTransport):
 
     def _merge_inital_and_boundary_values(self):
         x0 = self['pore.ic']
-        bc_pores = ~np.isnan(self['pore.bc.value'])
+        bc_pores = self._bc_value_mask
         x0[bc_pores] = self['pore.bc.value'][bc_pores]
         quantity = self.settings['quantity']
         self[quantity] = x0
@@ -1,6 +1,7 @@
 import logging
 import numpy as np
-import scipy.sparse.csgraph as spgr
+import scipy.sparse as sprs
+from numba import njit
 from openpnm.topotools import is_fully_connected
 from openpnm.algorithms import Algorithm
 from openpnm.utils import Docorator, TypedSet, Workspace
@@ -40,12 +41,18 @@ class TransportSettings:
         and should be updated by the algorithm on each iteration. Note that
         any properties which already depend on ``'quantity'`` will
         automatically be updated.
+    eliminate_bc_zeros : bool
+        If ``True``, the entries of ``A`` that are zeroed out when applying
+        value BCs are removed from its sparsity pattern. The default is
+        ``False`` since solvers handle explicit zeros, and keeping them
+        preserves the sparsity pattern of ``A`` across iterations.
 
     """
     phase = ''
     quantity = ''
     conductance = ''
     cache = True
+    eliminate_bc_zeros = False
     variable_props = TypedSet()
 
 
@@ -71,6 +78,27 @@ class Transport(Algorithm):
         self._b = None
         self._pure_A = None
         self._pure_b = None
+        self._diag_mean = None
+        self._pattern = None
+        self._symbolic = None
+        self._dirty = True
+        self._validated = None
+
+    @property
+    def _bc_rate_mask(self):
+        r"""
+        Boolean mask of pores with a rate BC. It is recomputed on every
+        access, so in-place edits of ``pore.bc.rate`` are always honoured.
+        """
+        return np.isfinite(self['pore.bc.rate'])
+
+    @property
+    def _bc_value_mask(self):
+        r"""
+        Boolean mask of pores with a value BC. It is recomputed on every
+        access, so in-place edits of ``pore.bc.value`` are always honoured.
+        """
+        return np.isfinite(self['pore.bc.value'])
 
     @property
     def x(self):
@@ -100,10 +128,36 @@ class Transport(Algorithm):
         if self._pure_A is None:
             phase = self.project[self.settings.phase]
             g = phase[gvals]
-            am = self.network.create_adjacency_matrix(weights=g, fmt='coo')
-            self._pure_A = spgr.laplacian(am).astype(float)
+            self._pure_A = self._build_laplacian(g)
+            # Scaling factor for value BCs, only changes along with _pure_A
+            self._diag_mean = self._pure_A.diagonal().mean()
         self.A = self._pure_A.copy()
 
+    def _build_laplacian(self, g):
+        r"""
+        Assembles the weighted graph Laplacian of the network directly in
+        CSR format using the given throat conductance values.
+
+        Notes
+        -----
+        The sparsity pattern only depends on ``throat.conns``, so it is
+        cached and only the values are refilled on subsequent calls. The
+        cached symbolic factorization is discarded whenever the pattern
+        has to be rebuilt.
+
+        """
+        conns = self.network['throat.conns']
+        g12, g21 = _split_conductance(g, Nt=conns.shape[0])
+        pattern = self._pattern
+        if (pattern is None) or not np.array_equal(pattern['conns'], conns):
+            pattern = self._pattern = _laplacian_pattern(conns, self.Np)
+            self._symbolic = None
+        slots, indices = pattern['slots'], pattern['indices']
+        w = np.concatenate((-g12, -g21, g12, g21))
+        data = np.bincount(slots[:w.size], weights=w, minlength=indices.size)
+        return sprs.csr_matrix((data, indices, pattern['indptr']),
+                               shape=(self.Np, self.Np))
+
     def _build_b(self):
         r"""
         Builds the RHS vector, without applying any boundary conditions or
@@ -141,29 +195,48 @@ class Transport(Algorithm):
         Applies all the boundary conditions that have been specified, by
         adding values to the *A* and *b* matrices.
         """
-        if 'pore.bc.rate' in self.keys():
+        # Fetch everything once, each self[...] goes through __getitem__
+        A, b = self.A, self.b
+        keys = self.keys()
+        if 'pore.bc.rate' in keys:
             # Update b
-            ind = np.isfinite(self['pore.bc.rate'])
-            self.b[ind] = self['pore.bc.rate'][ind]
-        if 'pore.bc.value' in self.keys():
-            f = self.A.diagonal().mean()
+            rates = self['pore.bc.rate']
+            ind = self._bc_rate_mask
+            b[ind] = rates[ind]
+        if 'pore.bc.value' in keys:
+            f = self._diag_mean
+            values = self['pore.bc.value']
+            ind = self._bc_value_mask
+            P_bc = np.where(ind)[0]
+            # Locate the entries of BC rows within the CSR arrays of A
+            indptr, indices = A.indptr, A.indices
+            counts = indptr[P_bc + 1] - indptr[P_bc]
+            offset = np.repeat(indptr[P_bc] - np.cumsum(counts) + counts, counts)
+            row_slots = np.arange(counts.sum()) + offset
+            rows, cols = np.repeat(P_bc, counts), indices[row_slots]
+            # A is structurally symmetric, so BC cols mirror the BC rows
+            col_slots = self._find_slots(rows=cols, cols=rows)
             # Update b (impose bc values)
-            ind = np.isfinite(self['pore.bc.value'])
-            self.b[ind] = self['pore.bc.value'][ind] * f
-            # Update b (subtract quantities from b to keep A symmetric)
-            x_BC = np.zeros_like(self.b)
-            x_BC[ind] = self['pore.bc.value'][ind]
-            self.b[~ind] -= (self.A * x_BC)[~ind]
-            # Update A
-            P_bc = self.to_indices(ind)
-            mask = np.isin(self.A.row, P_bc) | np.isin(self.A.col, P_bc)
+            b[ind] = values[ind] * f
+            # Update b (subtract quantities from b to keep A symmetric),
+            # only the BC columns of A contribute to the product
+            w = A.data[col_slots] * values[rows]
+            db = np.bincount(cols, weights=w, minlength=self.Np)
+            b[~ind] -= db[~ind]
+            # Update A, in-place on the CSR arrays
             # Remove entries from A for all BC rows/cols
-            self.A.data[mask] = 0
+            A.data[row_slots] = 0
+            A.data[col_slots] = 0
             # Add diagonal entries back into A
-            datadiag = self.A.diagonal()
-            datadiag[P_bc] = np.ones_like(P_bc, dtype=float) * f
-            self.A.setdiag(datadiag)
-            self.A.eliminate_zeros()
+            A.data[self._pattern['diag'][P_bc]] = f
+
+    def _find_slots(self, rows, cols):
+        r"""
+        Returns the locations of the given entries within ``A.data``, based
+        on the cached sparsity pattern of the Laplacian.
+        """
+        keys = self._pattern['keys']
+        return np.searchsorted(keys, rows.astype(np.int64)*self.Np + cols)
 
     def run(self, solver=None, x0=None, verbose=True):
         r"""
@@ -203,13 +276,24 @@ class Transport(Algorithm):
     def _run_special(self, solver, x0, w=1.0, verbose=None):
         # Make sure A,b are STILL well-defined
         self._validate_data_health()
+        # Reuse the symbolic factorization of A if the solver supports it
+        kwargs = {}
+        if isinstance(solver, solvers.DirectSolver):
+            if (self._symbolic is None) or (self._symbolic[0] != type(solver)):
+                self._symbolic = (type(solver), solver.symbolic_factor(self.A))
+            kwargs['sym'] = self._symbolic[1]
+        # Drop explicit zeros only now, so the pattern of A stays intact
+        # while assembling it
+        if self.settings['eliminate_bc_zeros']:
+            self.A.eliminate_zeros()
         # Solve and apply under-relaxation
-        x_new, exit_code = solver.solve(A=self.A, b=self.b, x0=x0)
+        x_new, exit_code = solver.solve(A=self.A, b=self.b, x0=x0, **kwargs)
         self.x = w * x_new + (1 - w) * self.x
         # Update A and b using the recent solution otherwise, for iterative
         # algorithms, residual will be incorrectly calculated ~0, since A & b
-        # are outdated
-        self._update_A_and_b()
+        # are outdated. Skipped if nothing that A & b depend on has changed.
+        if self._dirty:
+            self._update_A_and_b()
         # Update SteadyStateSolution object on algorithm
         self.soln[self.settings['quantity']][:] = self.x
         self.soln.is_converged = not bool(exit_code)
@@ -222,6 +306,7 @@ class Transport(Algorithm):
         self._build_A()
         self._build_b()
         self._apply_BCs()
+        self._dirty = False
 
     def _validate_x0(self):
         """
@@ -244,7 +329,7 @@ class Transport(Algorithm):
         Ensures the network is not clustered, and if it is, they're at
         least connected to a boundary condition pore.
         """
-        Ps = ~np.isnan(self['pore.bc.rate']) + ~np.isnan(self['pore.bc.value'])
+        Ps = self._bc_rate_mask | self._bc_value_mask
         if not is_fully_connected(network=self.network, pores_BC=Ps):
             msg = ("Your network is clustered. Run h = net.check_network_health()"
                    " followed by op.topotools.trim(net, pores=h['disconnected_pores'])"
@@ -261,11 +346,12 @@ class Transport(Algorithm):
             Ts_nan = self.Ts[~np.isfinite(g)]
         except IndexError:
             Ts_nan = self.Ts[np.any(~np.isfinite(g), axis=1)]
-        Ts_with_model = []
+        # Boolean lookup avoids sorting throat lists for membership test
+        has_model = np.zeros(self.Nt, dtype=bool)
         for obj in self.project:
             if conductance in obj.keys():
-                Ts_with_model.extend(obj.throats())
-        if not np.in1d(Ts_nan, Ts_with_model).all():
+                has_model[obj.throats()] = True
+        if not has_model[Ts_nan].all():
             msg = ("Found nans in A matrix, possibly because some throats"
                    f" don't have conductance model assigned: {conductance}")
             raise Exception(msg)
@@ -274,13 +360,16 @@ class Transport(Algorithm):
         """
         Checks whether A and b are well-defined, i.e. doesn't contain nans.
         """
-        import networkx as nx
-        from pandas import unique
-
+        # Skip if the very same A and b have already been validated
+        A, b = self.A, self.b
+        if (self._validated is not None) and all(
+                x is y for x, y in zip(self._validated, (A, A.data, b))):
+            return True
         # Validate network topology health
         self._validate_topology_health()
         # Short-circuit subsequent checks if data are healthy
-        if np.isfinite(self.A.data).all() and np.isfinite(self.b).all():
+        if _all_finite(A.data) and _all_finite(b):
+            self._validated = (A, A.data, b)
             return True
 
         # Fetch phase/geometries/physics
@@ -289,23 +378,26 @@ class Transport(Algorithm):
         # Locate the root of NaNs
         unaccounted_nans = []
         objs = [phase]
-        # Generate global dependency graph
-        dg = nx.compose_all([x.models.dependency_graph(deep=True) for x in objs])
+        # Generate global dependency graph as a prop -> parent props mapping
+        parents = {}
+        for obj in objs:
+            dg = obj.models.dependency_graph(deep=True)
+            for k, v in dg.pred.items():
+                parents.setdefault(k, set()).update(v)
         d = {}  # maps prop -> obj.name
         for obj in objs:
             for k, v in check_data_health(obj).items():
                 if "Has NaNs" in v:
                     # FIXME: The next line doesn't cover multi-level props
                     base_prop = ".".join(k.split(".")[:2])
-                    if base_prop in dg.nodes:
+                    if base_prop in parents:
                         d[base_prop] = obj.name
                     else:
                         unaccounted_nans.append(base_prop)
-        # Generate dependency subgraph for props with NaNs
-        dg_nans = nx.subgraph(dg, d.keys())
-        # Find prop(s)/object(s) from which NaNs have propagated
-        root_props = [n for n in d.keys() if not nx.ancestors(dg_nans, n)]
-        root_objs = unique([d[x] for x in nx.topological_sort(dg_nans)])
+        # Find prop(s)/object(s) from which NaNs have propagated, i.e. those
+        # without any parent props that also have NaNs
+        root_props = [n for n in d.keys() if not (parents[n] & d.keys())]
+        root_objs = list(dict.fromkeys([d[x] for x in root_props + list(d)]))
         # Throw error with helpful info on how to resolve the issue
         if root_props:
             msg = ("Found nans in A matrix, possibly caused by nans in"
@@ -376,32 +468,34 @@ class Transport(Algorithm):
         if (throats.size == 0) and (pores.size == 0):
             raise Exception('Must specify either pores or throats')
 
+        # Fetch data once, each lookup goes through __getitem__
         network = self.project.network
         phase = self.project[self.settings['phase']]
         g = phase[self.settings['conductance']]
-
+        g12, g21 = _split_conductance(g, Nt=self.Nt)
         P12 = network['throat.conns']
-        X12 = self.x[P12]
-        if g.size == self.Nt:
-            g = np.tile(g, (2, 1)).T    # Make conductance an Nt by 2 matrix
-        # The next line is critical for rates to be correct
-        g = np.flip(g, axis=1)
-        Qt = np.diff(g*X12, axis=1).squeeze()
+        x = self.x
 
         if throats.size:
-            R = np.absolute(Qt[throats])
+            P1, P2 = P12[throats, 0], P12[throats, 1]
+            # Note the crossing of the conductance and end-pore values
+            Qt = g12[throats]*x[P2] - g21[throats]*x[P1]
+            R = np.absolute(Qt)
             if mode == 'group':
                 R = np.sum(R)
         elif pores.size:
-            Qp = np.zeros((self.Np, ))
-            np.add.at(Qp, P12[:, 0], -Qt)
-            np.add.at(Qp, P12[:, 1], Qt)
+            Qp = _accumulate_rate(P12, g12, g21, x, self.Np)
             R = Qp[pores]
             if mode == 'group':
                 R = np.sum(R)
 
         return np.array(R, ndmin=1)
 
+    def set_BC(self, pores=None, bctype=[], bcvalues=[], mode='add'):
+        # Changing BCs invalidates the current A and b
+        self._dirty = True
+        super().set_BC(pores=pores, bctype=bctype, bcvalues=bcvalues, mode=mode)
+
     def clear_value_BCs(self):
         r"""
         Clear all value BCs
@@ -454,3 +548,71 @@ class Transport(Algorithm):
             docstring for ``set_BC``.
         """
         self.set_BC(pores=pores, bctype='rate', bcvalues=rates, mode=mode)
+
+
+def _split_conductance(g, Nt):
+    r"""
+    Returns the conductance values in the conns and reverse-conns
+    directions, respectively.
+    """
+    g = np.asarray(g, dtype=float)
+    if g.shape == (Nt, ):
+        return g, g
+    if g.shape == (2 * Nt, ):
+        return g[:Nt], g[Nt:]
+    if g.shape == (Nt, 2):
+        return g[:, 0], g[:, 1]
+    raise Exception('Received conductance values are of incorrect length')
+
+
+def _laplacian_pattern(conns, Np):
+    r"""
+    Computes the CSR sparsity pattern of the graph Laplacian defined by
+    ``conns``, along with the slot in ``data`` that each entry of
+    ``[-g12, -g21, g12, g21, 0]`` (with 0 being Np-long) sums into. The
+    sorted ``row*Np + col`` keys and the slots of the diagonal entries are
+    also returned for locating entries.
+    """
+    P1, P2 = conns[:, 0], conns[:, 1]
+    Ps = np.arange(Np)
+    row = np.concatenate((P1, P2, P2, P1, Ps)).astype(np.int64)
+    col = np.concatenate((P2, P1, P2, P1, Ps)).astype(np.int64)
+    keys, slots = np.unique(row*Np + col, return_inverse=True)
+    indices = (keys % Np).astype(np.int32)
+    indptr = np.searchsorted(keys // Np, np.arange(Np + 1)).astype(np.int32)
+    pattern = {
+        'conns': conns.copy(),
+        'slots': slots,
+        'indices': indices,
+        'indptr': indptr,
+        'keys': keys,
+        'diag': slots[-Np:],
+    }
+    return pattern
+
+
+@njit
+def _accumulate_rate(P12, g12, g21, x, Np):
+    r"""
+    Computes the net rate leaving each pore by scattering throat rates
+    into their end pores, without forming the throat rates as an array.
+    """
+    Qp = np.zeros(Np)
+    for k in range(P12.shape[0]):
+        i, j = P12[k, 0], P12[k, 1]
+        Qt = g12[k]*x[j] - g21[k]*x[i]
+        Qp[i] -= Qt
+        Qp[j] += Qt
+    return Qp
+
+
+@njit
+def _all_finite(arr):
+    r"""
+    Checks whether all values of the given 1D array are finite, exiting
+    at the first nan/inf encountered.
+    """
+    for i in range(arr.size):
+        if not np.isfinite(arr[i]):
+            return False
+    return True
@@ -127,7 +127,7 @@ class TransientMultiPhysics(Algorithm):
                 alg.x = x
                 # Build A and b
                 alg._update_A_and_b()
-                A = alg.A.tocsc()
+                A = alg.A  # already CSR, so no conversion needed
                 b = alg.b
                 # Retrieve volume
                 V = alg.network[alg.settings["pore_volume"]]
@@ -378,8 +378,8 @@ class Base2(dict):
         return mask
 
     def to_indices(self, mask):
-        mask = np.array(mask, dtype=bool)
-        return np.where(mask)[0]
+        mask = np.asarray(mask, dtype=bool)
+        return np.flatnonzero(mask)
 
     def props(self, element=['pore', 'throat']):
         if element is None:
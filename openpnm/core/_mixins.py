@@ -5,6 +5,22 @@ from openpnm.utils import PrintableList
 __all__ = ['ParserMixin', 'LabelMixin', 'LegacyMixin']
 
 
+# Accepted spellings of each element, see ParserMixin._parse_element
+_elements = {'pore': 'pore', 'pores': 'pore',
+             'throat': 'throat', 'throats': 'throat'}
+
+
+# Integer codes of the modes accepted by LabelMixin._get_indices
+_label_modes = {
+    'or': 0, 'any': 0, 'union': 0,
+    'and': 1, 'all': 1, 'intersection': 1,
+    'xor': 2, 'exclusive_or': 2,
+    'nor': 3, 'not': 3, 'none': 3,
+    'nand': 4,
+    'xnor': 5, 'nxor': 5,
+}
+
+
 class ParserMixin:
 
     def _parse_indices(self, indices):
@@ -27,20 +43,20 @@ class ParserMixin:
         This method should only be called by the method that is actually using
         the locations, to avoid calling it multiple times.
 
+        Integer arrays are not copied, so the returned array may share memory
+        with ``indices`` and should not be modified in-place.
+
         """
         if indices is None:
             indices = np.array([], ndmin=1, dtype=int)
-        locs = np.array(indices, ndmin=1)
+        locs = np.atleast_1d(np.asarray(indices))
         # If boolean array, convert to indices
         if locs.dtype == bool:
-            if np.size(locs) == self.Np:
-                locs = self.Ps[locs]
-            elif np.size(locs) == self.Nt:
-                locs = self.Ts[locs]
-            else:
+            if np.size(locs) not in (self.Np, self.Nt):
                 raise Exception('Mask of locations must be either '
                                 + 'Np nor Nt long')
-        locs = locs.astype(dtype=int)
+            locs = np.flatnonzero(locs)
+        locs = locs.astype(dtype=int, copy=False)
         return locs
 
     def _parse_element(self, element, single=False):
@@ -69,17 +85,16 @@ class ParserMixin:
         # Convert element to a list for subsequent processing
         if isinstance(element, str):
             element = [element]
-        # Convert 'pore.prop' and 'throat.prop' into just 'pore' and 'throat'
-        element = [item.split('.', 1)[0] for item in element]
-        # Make sure all are lowercase
-        element = [item.lower() for item in element]
-        # Deal with an plurals
-        element = [item.rsplit('s', maxsplit=1)[0] for item in element]
+        # Convert 'pore.prop' and 'throat.prop' into just 'pore' and 'throat',
+        # dealing with case and plurals, and remove duplicates in a single pass
+        parsed = []
         for item in element:
-            if item not in ['pore', 'throat']:
+            item = _elements.get(item.split('.', 1)[0].lower())
+            if item is None:
                 raise Exception('All keys must start with either pore or throat')
-        # Remove duplicates if any
-        _ = [element.remove(L) for L in element if element.count(L) > 1]
+            if item not in parsed:
+                parsed.append(item)
+        element = parsed
         if single:
             if len(element) > 1:
                 raise Exception('Both elements recieved when single element '
@@ -108,6 +123,9 @@ class ParserMixin:
             raise Exception('Labels cannot be None')
         if isinstance(labels, str):
             labels = [labels]
+        # Fetch existing labels once for use by all wildcards
+        if any('*' in label for label in labels):
+            Ls = [L.split('.', 1)[-1] for L in self.labels(element=element)]
         # Parse the labels list
         parsed_labels = []
         for label in labels:
@@ -116,20 +134,21 @@ class ParserMixin:
                 label = label.split('.', 1)[-1]
             # Deal with wildcards
             if '*' in label:
-                Ls = [L.split('.', 1)[-1] for L in self.labels(element=element)]
-                if label.startswith('*'):
-                    temp = [L for L in Ls if L.endswith(label.strip('*'))]
-                if label.endswith('*'):
-                    temp = [L for L in Ls if L.startswith(label.strip('*'))]
+                stem = label.strip('*')
+                if label.startswith('*') and label.endswith('*'):
+                    temp = [L for L in Ls if stem in L]
+                elif label.startswith('*'):
+                    temp = [L for L in Ls if L.endswith(stem)]
+                else:
+                    temp = [L for L in Ls if L.startswith(stem)]
                 temp = [element+'.'+L for L in temp]
             elif element+'.'+label in self.keys():
                 temp = [element+'.'+label]
             else:
                 temp = [element+'.'+label]
             parsed_labels.extend(temp)
-            # Remove duplicates if any
-            _ = [parsed_labels.remove(L) for L in parsed_labels
-                 if parsed_labels.count(L) > 1]
+        # Remove duplicates if any, preserving order
+        parsed_labels = list(dict.fromkeys(parsed_labels))
         return parsed_labels
 
     def _parse_mode(self, mode, allowed=None, single=False):
@@ -163,8 +182,8 @@ class ParserMixin:
             if (allowed is not None) and (item not in allowed):
                 raise Exception('\'mode\' must be one of the following: '
                                 + allowed.__str__())
-        # Remove duplicates, if any
-        _ = [mode.remove(L) for L in mode if mode.count(L) > 1]
+        # Remove duplicates, if any, preserving order
+        mode = list(dict.fromkeys(mode))
         if single:
             if len(mode) > 1:
                 raise Exception('Multiple modes received when only one mode '
@@ -192,13 +211,25 @@ class LegacyMixin:
 
     def _map(self, ids, element, filtered):
         ids = np.array(ids, dtype=np.int64)
-        locations = self._get_indices(element=element)
-        self_in_ids = np.isin(ids, self[element+'._id'], assume_unique=True)
-        ids_in_self = np.isin(self[element+'._id'], ids, assume_unique=True)
-        mask = np.zeros(shape=ids.shape, dtype=bool)
-        mask[self_in_ids] = True
-        ind = np.ones_like(mask, dtype=np.int64) * -1
-        ind[self_in_ids] = locations[ids_in_self]
+        keys = np.array(self[element+'._id'], dtype=np.int64)
+        if (ids.size == 0) or (keys.size == 0):
+            ind = np.full(ids.shape, -1, dtype=np.int64)
+        else:
+            lo = min(ids.min(), keys.min())
+            span = max(ids.max(), keys.max()) - lo
+            if span <= 6*(ids.size + keys.size):
+                # Ids are dense enough for a direct lookup table, with -1
+                # marking ids not found on self
+                table = np.full(span + 1, -1, dtype=np.int64)
+                table[keys - lo] = np.arange(keys.size)
+                ind = table[ids - lo]
+            else:
+                # Otherwise hash the ids on self once and look up each
+                # given id in a single pass
+                lookup = dict(zip(keys.tolist(), range(keys.size)))
+                ind = np.fromiter((lookup.get(i, -1) for i in ids.tolist()),
+                                  dtype=np.int64, count=ids.size)
+        mask = ind >= 0
         if filtered:
             return ind[mask]
         t = namedtuple('index_map', ('indices', 'mask'))
@@ -276,6 +307,117 @@ class LegacyMixin:
 class LabelMixin:
     """Brief explanation of LabelMixin"""
 
+    # Changing keys may add or remove labels, so cached lookups are dropped
+    def __setitem__(self, key, value):
+        self._clear_label_cache()
+        super().__setitem__(key, value)
+
+    def __delitem__(self, key):
+        self._clear_label_cache()
+        super().__delitem__(key)
+
+    def pop(self, *args):
+        self._clear_label_cache()
+        return super().pop(*args)
+
+    def clear(self, *args, **kwargs):
+        self._clear_label_cache()
+        super().clear(*args, **kwargs)
+
+    def update(self, *args, **kwargs):
+        self._clear_label_cache()
+        super().update(*args, **kwargs)
+
+    def setdefault(self, *args):
+        self._clear_label_cache()
+        return super().setdefault(*args)
+
+    def _clear_label_cache(self):
+        r"""
+        Drops the cached label index, parsed label queries and prop names.
+        """
+        self._label_index = None
+        self._label_keys = None
+        self._parsed_labels = {}
+        self._props_cache = {}
+
+    def _parse_labels_cached(self, labels, element):
+        r"""
+        Memoized version of ``_parse_labels``, for queries that are repeated
+        many times with the same labels.
+
+        Notes
+        -----
+        Only the parsed keys are cached, which depend on the set of labels
+        present but not on their values. The label arrays themselves are
+        often modified in-place, so the indices are always recomputed.
+
+        """
+        key = (element, labels if isinstance(labels, str) else tuple(labels))
+        cache = getattr(self, '_parsed_labels', None)
+        if cache is None:
+            cache = self._parsed_labels = {}
+        if key not in cache:
+            if len(cache) >= 128:
+                cache.clear()
+            cache[key] = self._parse_labels(labels=labels, element=element)
+        return cache[key]
+
+    def _get_label_index(self):
+        r"""
+        Returns the names of all labels on the object, in the order they
+        were added, as ``(element, label)`` pairs. The result is cached
+        until a key is added, replaced or removed.
+        """
+        if getattr(self, '_label_index', None) is None:
+            self._label_index = tuple(
+                (k.split('.', 1)[0], k) for k, v in self.items()
+                if v.dtype == bool)
+        return self._label_index
+
+    def _get_label_keys(self):
+        r"""
+        Returns a frozenset of all label names, cached along with the label
+        index for fast membership tests.
+        """
+        if getattr(self, '_label_keys', None) is None:
+            self._label_keys = frozenset(k for _, k in self._get_label_index())
+        return self._label_keys
+
+    def _single_label_key(self, element, labels, mode):
+        r"""
+        Returns the full key of the label array when ``labels`` is a single,
+        fully specified label (as a string or a one item list) and ``mode``
+        is 'or', 'and' or 'xor', in which case the query result is just
+        that array. Returns ``None`` if the query needs the general path,
+        such as for several labels or wildcards.
+        """
+        if isinstance(labels, (list, tuple)) and (len(labels) == 1):
+            labels = labels[0]
+        if not isinstance(labels, str) or (_label_modes.get(mode) not in [0, 1, 2]):
+            return None
+        if labels in [self.name, 'all']:
+            return element + '.' + labels
+        if not labels.startswith(element + '.'):
+            labels = element + '.' + labels
+        if labels in self._get_label_keys():
+            return labels
+        return None
+
+    def _count_single_label(self, element, label, mode):
+        r"""
+        Counts the locations of a single, fully specified label straight from
+        its array. Returns ``None`` if the query needs the general path.
+
+        Notes
+        -----
+        The count is not cached since label arrays are often edited in place.
+        """
+        key = self._single_label_key(element=element, labels=label, mode=mode)
+        if key is None:
+            return None
+        return np.count_nonzero(self[key])
+
     def _get_labels(self, element, locations, mode):
         r"""
         This is the actual label getter method, but it should not be called
@@ -285,12 +427,14 @@ class LabelMixin:
         locations = self._parse_indices(locations)
         element = self._parse_element(element=element)
         # Collect list of all pore OR throat labels
-        labels = [i for i in self.keys(mode='labels') if i.split('.', 1)[0] in element]
-        labels.sort()
+        labels = sorted(k for e, k in self._get_label_index() if e in element)
         labels = np.array(labels)  # Convert to ndarray for following checks
-        # Make an 2D array with locations in rows and labels in cols
-        arr = np.vstack([self[item][locations] for item in labels]).T
-        num_hits = np.sum(arr, axis=0)  # Number of locations with each label
+        # Fetch all label arrays at once, bypassing __getitem__ since the
+        # index only holds keys actually stored on this object
+        arrays = [dict.__getitem__(self, item) for item in labels]
+        # Number of locations with each label
+        num_hits = np.fromiter((np.count_nonzero(a[locations]) for a in arrays),
+                               dtype=np.int32, count=len(arrays))
         if mode in ['or', 'union', 'any']:
             temp = labels[num_hits > 0]
         elif mode in ['and', 'intersection']:
@@ -375,10 +519,8 @@ class LabelMixin:
                 element = ['pore', 'throat']
             if isinstance(element, str):
                 element = [element]
-            labels = PrintableList()
-            for k, v in self.items():
-                if (k.split('.', 1)[0] in element) and (v.dtype == bool):
-                    labels.append(k)
+            labels = PrintableList(k for e, k in self._get_label_index()
+                                   if e in element)
         elif (np.size(pores) > 0) and (np.size(throats) > 0):
             raise Exception('Cannot perform label query on pores and '
                             + 'throats simultaneously')
@@ -439,21 +581,40 @@ class LabelMixin:
             self.set_label(label=label, throats=throats, mode=mode)
             return
         elif pores is not None:
-            locs = self._parse_indices(pores)
+            locs = pores
             element = 'pore'
         elif throats is not None:
-            locs = self._parse_indices(throats)
+            locs = throats
             element = 'throat'
-
+        if mode in ['add', 'overwrite', 'remove']:
+            # Full length boolean masks are applied directly as masks,
+            # anything else is converted to indices
+            is_mask = isinstance(locs, np.ndarray) and (locs.dtype == bool) \
+                and (locs.shape == (self._count(element), ))
+            if not is_mask:
+                locs = self._parse_indices(locs)
+
+        self._clear_label_cache()
         if mode == 'add':
             if element + '.' + label not in self.keys():
                 self[element + '.' + label] = False
-            self[element + '.' + label][locs] = True
+            if is_mask:
+                arr = self[element + '.' + label]
+                np.logical_or(arr, locs, out=arr)
+            else:
+                self[element + '.' + label][locs] = True
         if mode == 'overwrite':
-            self[element + '.' + label] = False
-            self[element + '.' + label][locs] = True
+            if is_mask:
+                self[element + '.' + label] = locs.copy()
+            else:
+                self[element + '.' + label] = False
+                self[element + '.' + label][locs] = True
         if mode == 'remove':
-            self[element + '.' + label][locs] = False
+            arr = self[element + '.' + label]
+            if is_mask:
+                np.logical_and(arr, ~locs, out=arr)
+            else:
+                arr[locs] = False
         if mode == 'clear':
             self['pore' + '.' + label] = False
             self['throat' + '.' + label] = False
@@ -461,55 +622,61 @@ class LabelMixin:
             _ = self.pop('pore.' + label, None)
             _ = self.pop('throat.' + label, None)
 
-    def _get_indices(self, element, labels, mode='or'):
+    def _get_mask(self, element, labels, mode='or', _parsed=False):
+        r"""
+        Returns a boolean mask of the locations where the given labels exist,
+        combined according to ``mode``. This is used by ``_get_indices``
+        and by the counting methods, which don't need the indices.
+
+        If ``_parsed`` is ``True`` then ``element`` and ``labels`` are
+        assumed to have been parsed already by the caller.
+
+        Notes
+        -----
+        With a single label and the 'or', 'and' or 'xor' mode the label
+        array itself is returned, so the result must not be modified.
+
+        """
+        # Parse and validate all input values.
+        if not _parsed:
+            element = self._parse_element(element, single=True)
+            labels = self._parse_labels_cached(labels=labels, element=element)
+        if mode not in _label_modes.keys():
+            raise Exception('Unsupported mode: '+mode)
+        # A single label maps to itself in these modes
+        if (len(labels) == 1) and (_label_modes[mode] in [0, 1, 2]):
+            return self[labels[0]].astype(bool, copy=False)
+        # Reduce over all label arrays using bit-packed masks. Parsed
+        # labels are already full 'element.label' keys
+        masks = (self[k].astype(bool, copy=False) for k in labels)
+        return _reduce_labels(masks, _label_modes[mode], self._count(element))
+
+    def _get_indices(self, element, labels, mode='or', _parsed=False):
         r"""
         This is the actual method for getting indices, but should not be called
         directly.  Use ``pores`` or ``throats`` instead.
+
+        If ``_parsed`` is ``True`` then ``element`` and ``labels`` are
+        assumed to have been parsed already by the caller.
         """
         # Parse and validate all input values.
-        element = self._parse_element(element, single=True)
-        labels = self._parse_labels(labels=labels, element=element)
-
-        # Begin computing label array
-        if mode in ['or', 'any', 'union']:
-            union = np.zeros([self._count(element), ], dtype=bool)
-            for item in labels:  # Iterate over labels and collect all indices
-                union = union + self[element+'.'+item.split('.', 1)[-1]]
-            ind = union
-        elif mode in ['and', 'all', 'intersection']:
-            intersect = np.ones([self._count(element), ], dtype=bool)
-            for item in labels:  # Iterate over labels and collect all indices
-                intersect = intersect*self[element+'.'+item.split('.', 1)[-1]]
-            ind = intersect
-        elif mode in ['xor', 'exclusive_or']:
-            xor = np.zeros([self._count(element), ], dtype=int)
-            for item in labels:  # Iterate over labels and collect all indices
-                info = self[element+'.'+item.split('.', 1)[-1]]
-                xor = xor + np.int8(info)
-            ind = (xor == 1)
-        elif mode in ['nor', 'not', 'none']:
-            nor = np.zeros([self._count(element), ], dtype=int)
-            for item in labels:  # Iterate over labels and collect all indices
-                info = self[element+'.'+item.split('.', 1)[-1]]
-                nor = nor + np.int8(info)
-            ind = (nor == 0)
-        elif mode in ['nand']:
-            nand = np.zeros([self._count(element), ], dtype=int)
-            for item in labels:  # Iterate over labels and collect all indices
-                info = self[element+'.'+item.split('.', 1)[-1]]
-                nand = nand + np.int8(info)
-            ind = (nand < len(labels)) * (nand > 0)
-        elif mode in ['xnor', 'nxor']:
-            xnor = np.zeros([self._count(element), ], dtype=int)
-            for item in labels:  # Iterate over labels and collect all indices
-                info = self[element+'.'+item.split('.', 1)[-1]]
-                xnor = xnor + np.int8(info)
-            ind = (xnor > 1)
-        else:
-            raise Exception('Unsupported mode: '+mode)
-        # Extract indices from boolean mask
-        ind = np.where(ind)[0]
-        ind = ind.astype(dtype=int)
+        if not _parsed:
+            element = self._parse_element(element, single=True)
+            # Short-circuit single label queries, which are the same for the
+            # 'or', 'and' and 'xor' modes, and the common query for all
+            # locations in particular
+            key = self._single_label_key(element=element, labels=labels,
+                                         mode=mode)
+            if key is not None:
+                mask = self[key]
+                if key.split('.', 1)[1] in [self.name, 'all'] and mask.all():
+                    return np.arange(mask.size)
+                return np.flatnonzero(mask).astype(dtype=int, copy=False)
+            labels = self._parse_labels_cached(labels=labels, element=element)
+        ind = self._get_mask(element=element, labels=labels, mode=mode,
+                             _parsed=True)
+        # Extract indices from boolean mask, flatnonzero already gives intp
+        ind = np.flatnonzero(ind).astype(dtype=int, copy=False)
         return ind
 
     def pores(self, labels=None, mode='or', asmask=False, to_global=False):
@@ -726,8 +893,8 @@ class LabelMixin:
         else:
             return(np.array([], dtype=int))
         labels = self._parse_labels(labels=labels, element=element)
-        labels = [element+'.'+item.split('.', 1)[-1] for item in labels]
-        all_locs = self._get_indices(element=element, labels=labels, mode=mode)
+        all_locs = self._get_indices(element=element, labels=labels,
+                                     mode=mode, _parsed=True)
         mask = self._tomask(indices=all_locs, element=element)
         ind = mask[locations]
         return locations[ind]
@@ -794,9 +961,13 @@ class LabelMixin:
         5
 
         """
-        # Count number of pores of specified type
-        Ps = self._get_indices(labels=labels, mode=mode, element='pore')
-        Np = np.shape(Ps)[0]
+        # Single label queries need neither label parsing nor a mask
+        Np = self._count_single_label(element='pore', label=labels, mode=mode)
+        if Np is not None:
+            return Np
+        # Count number of pores of specified type, without forming indices
+        mask = self._get_mask(labels=labels, mode=mode, element='pore')
+        Np = np.count_nonzero(mask)
         return Np
 
     def num_throats(self, labels='all', mode='union'):
@@ -845,36 +1016,86 @@ class LabelMixin:
         not included.
 
         """
-        # Count number of pores of specified type
-        Ts = self._get_indices(labels=labels, mode=mode, element='throat')
-        Nt = np.shape(Ts)[0]
+        # Single label queries need neither label parsing nor a mask
+        Nt = self._count_single_label(element='throat', label=labels, mode=mode)
+        if Nt is not None:
+            return Nt
+        # Count number of throats of specified type, without forming indices
+        mask = self._get_mask(labels=labels, mode=mode, element='throat')
+        Nt = np.count_nonzero(mask)
         return Nt
 
-    def props(self, *args, **kwargs):
-        # Overload props on base to remove labels
-        props = set(super().props(*args, **kwargs))
-        labels = set(self.labels())
-        props = props.difference(labels)
-        return PrintableList(props)
+    def props(self, element=None):
+        # Overload props on base to remove labels. The names are cached until
+        # a key changes, but a new list is returned since callers may edit it
+        key = tuple(element) if isinstance(element, list) else element
+        cache = getattr(self, '_props_cache', None)
+        if cache is None:
+            cache = self._props_cache = {}
+        if key not in cache:
+            labels = self._get_label_keys()
+            props = super().props(element=element)
+            cache[key] = tuple(k for k in props if k not in labels)
+        return PrintableList(cache[key])
 
     def __str__(self):
         s = super().__str__()
         # s = s.rpartition('\n')[0]
         horizontal_rule = '―' * 78
-        lines = []
-        lines.append(s)
-        lines.append("{0:<5s} {1:<45s} {2:<10s}".format('#',
-                                                        'Labels',
-                                                        'Assigned Locations'))
-        lines.append(horizontal_rule)
-        labels = self.labels()
-        labels.sort()
-        fmt = "{0:<5d} {1:<45s} {2:<10d}"
-        for i, item in enumerate(labels):
-            prop = item
-            if len(prop) > 35:
-                prop = prop[0:32] + '...'
-            if '._' not in prop:
-                lines.append(fmt.format(i + 1, prop, np.sum(self[item])))
-        lines.append(horizontal_rule)
-        return '\n'.join(lines)
+        header = "{0:<5s} {1:<45s} {2:<10s}".format('#',
+                                                   'Labels',
+                                                   'Assigned Locations')
+        # Hidden labels (i.e. 'pore._id') are skipped
+        labels = [item for item in sorted(self.labels()) if '._' not in item]
+        names = [item if len(item) <= 35 else item[0:32] + '...'
+                 for item in labels]
+        # Label arrays are read straight from the dict, and counted without
+        # stacking them, which would copy every array first
+        counts = [np.count_nonzero(dict.__getitem__(self, item))
+                  for item in labels]
+        fmt = "{0:<5d} {1:<45s} {2:<10d}".format
+        body = [fmt(i + 1, n, c) for i, (n, c) in enumerate(zip(names, counts))]
+        return '\n'.join([s, header, horizontal_rule, *body, horizontal_rule])
+
+
+def _reduce_labels(masks, mode, N):
+    r"""
+    Combines the given boolean masks (one per label) according to the
+    integer ``mode`` code, see ``_label_modes``.
+
+    Notes
+    -----
+    The masks are bit-packed into 64-bit words so each bitwise operation
+    handles 64 locations at once. Besides the 'or' and 'and' of all
+    masks, a second bit-plane tracks locations hit at least twice, which
+    is all that is needed for the count based modes.
+
+    """
+    nwords = (N + 63)//64
+    ones = np.zeros(nwords, dtype=np.uint64)  # Hit at least once
+    twos = np.zeros(nwords, dtype=np.uint64)  # Hit at least twice
+    alls = np.full(nwords, np.iinfo(np.uint64).max, dtype=np.uint64)
+    buf = np.zeros(nwords*8, dtype=np.uint8)
+    w = buf.view(np.uint64)
+    tmp = np.empty_like(w)
+    # Accumulate in place to avoid allocating new words for each label
+    for mask in masks:
+        buf[:(N + 7)//8] = np.packbits(mask, bitorder='little')
+        np.bitwise_and(ones, w, out=tmp)
+        np.bitwise_or(twos, tmp, out=twos)
+        np.bitwise_or(ones, w, out=ones)
+        np.bitwise_and(alls, w, out=alls)
+    if mode == 0:
+        out = ones
+    elif mode == 1:
+        out = alls
+    elif mode == 2:
+        out = ones & ~twos
+    elif mode == 3:
+        out = ~ones
+    elif mode == 4:
+        out = ones & ~alls
+    else:
+        out = twos
+    out = np.unpackbits(out.view(np.uint8), count=N, bitorder='little')
+    return out.view(bool)
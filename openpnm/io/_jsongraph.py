@@ -1,5 +1,6 @@
 import os
 import json
+import base64
 import pickle
 import logging
 import numpy as np
@@ -7,9 +8,62 @@ from pathlib import Path
 from openpnm.io import _parse_filename
 from openpnm.network import Network
 logger = logging.getLogger(__name__)
+try:
+    import orjson
+except ModuleNotFoundError:
+    orjson = None
+
+
+# Allowed keys of a single-graph JGF document, copied from jgf_schema.pkl
+_GRAPH_KEYS = frozenset({'label', 'directed', 'type', 'metadata', 'nodes', 'edges'})
+_NODE_KEYS = frozenset({'id', 'label', 'metadata'})
+_EDGE_KEYS = frozenset({'id', 'source', 'target', 'relation', 'directed',
+                        'label', 'metadata'})
+
+
+def _is_valid_single_graph(json_file):
+    r"""
+    Checks a ``{'graph': {...}}`` document against the JGF schema by hand.
+
+    This only covers the single-graph form written by
+    ``network_to_jsongraph``, and is much faster than ``jsonschema`` on
+    large networks. A ``False`` result is not conclusive, so the caller
+    falls back to the full schema.
+    """
+    def _is(obj, key, types):
+        return key not in obj or isinstance(obj[key], types)
+
+    if not isinstance(json_file, dict) or json_file.keys() != {'graph'}:
+        return False
+    graph = json_file['graph']
+    if not (isinstance(graph, dict) and graph.keys() <= _GRAPH_KEYS
+            and _is(graph, 'label', str) and _is(graph, 'type', str)
+            and _is(graph, 'directed', (bool, type(None)))
+            and _is(graph, 'metadata', (dict, type(None)))
+            and _is(graph, 'nodes', (list, type(None)))
+            and _is(graph, 'edges', (list, type(None)))):
+        return False
+    for node in graph.get('nodes') or []:
+        if not (isinstance(node, dict) and node.keys() <= _NODE_KEYS
+                and isinstance(node.get('id'), str)
+                and _is(node, 'label', str)
+                and _is(node, 'metadata', (dict, type(None)))):
+            return False
+    for edge in graph.get('edges') or []:
+        if not (isinstance(edge, dict) and edge.keys() <= _EDGE_KEYS
+                and isinstance(edge.get('source'), str)
+                and isinstance(edge.get('target'), str)
+                and _is(edge, 'id', str) and _is(edge, 'label', str)
+                and _is(edge, 'relation', str)
+                and _is(edge, 'directed', (bool, type(None)))
+                and _is(edge, 'metadata', (dict, type(None)))):
+            return False
+    return True
 
 
 def _validate_json(json_file):
+    if _is_valid_single_graph(json_file):
+        return True
     import jsonschema
     # Validate name of schema file
     relative_path = '../../utils/jgf_schema.pkl'
@@ -28,7 +82,168 @@ def _validate_json(json_file):
         return False
 
 
-def network_to_jsongraph(network, filename=''):
+def _dumps(json_obj):
+    # Encode to UTF-8 bytes, using orjson's single-pass encoder if available
+    if orjson is not None:
+        return orjson.dumps(json_obj, option=orjson.OPT_INDENT_2)
+    return json.dumps(json_obj, indent=2).encode('utf-8')
+
+
+def _loads(payload):
+    # Decode UTF-8 bytes, using orjson if available
+    if orjson is not None:
+        return orjson.loads(payload)
+    return json.loads(payload)
+
+
+def _encode_array(arr, dtype):
+    # Pack an array as a base64 string of little-endian values
+    arr = np.ascontiguousarray(arr, dtype=dtype)
+    return base64.b64encode(arr.tobytes()).decode('ascii')
+
+
+def _decode_array(s, dtype, shape):
+    # Inverse of _encode_array; copied since frombuffer arrays are read-only
+    return np.frombuffer(base64.b64decode(s), dtype=dtype).reshape(shape).copy()
+
+
+# Layout of one node and one edge as written by json.dumps(..., indent=2)
+_NODE_TEMPLATE = (
+    b'      {\n'
+    b'        "id": "%d",\n'
+    b'        "metadata": {\n'
+    b'          "node_squared_radius": %d,\n'
+    b'          "node_coordinates": {\n'
+    b'            "x": %d,\n'
+    b'            "y": %d,\n'
+    b'            "z": %d\n'
+    b'          }\n'
+    b'        }\n'
+    b'      }')
+_EDGE_TEMPLATE = (
+    b'      {\n'
+    b'        "id": "%d",\n'
+    b'        "source": "%d",\n'
+    b'        "target": "%d",\n'
+    b'        "metadata": {\n'
+    b'          "link_length": %r,\n'
+    b'          "link_squared_radius": %r\n'
+    b'        }\n'
+    b'      }')
+_GRAPH_TEMPLATE = (
+    b'{\n'
+    b'  "graph": {\n'
+    b'    "metadata": {\n'
+    b'      "number_of_nodes": %d,\n'
+    b'      "number_of_links": %d\n'
+    b'    },\n'
+    b'    "nodes": [\n%s\n'
+    b'    ],\n'
+    b'    "edges": [\n%s\n'
+    b'    ]\n'
+    b'  }\n'
+    b'}')
+
+
+def _graph_columns(network):
+    # Convert each property to a list of Python scalars in a single pass
+    squared_radius = ((network['pore.diameter'] / 2).astype(int)**2).tolist()
+    coords = network['pore.coords'].astype(int).tolist()
+    conns = network['throat.conns'].tolist()
+    link_length = network['throat.length'].astype(float).tolist()
+    link_squared_radius = [
+        r**2 for r in (network['throat.diameter'] / 2).astype(float).tolist()]
+    return squared_radius, coords, conns, link_length, link_squared_radius
+
+
+def _render_graph(network):
+    r"""
+    Renders the standard JGF document straight to bytes from templates.
+
+    The result is identical to encoding the output of ``_graph_to_objects``
+    with ``json.dumps(..., indent=2)``, but no dicts are built per pore or
+    throat. Returns ``None`` if the templates cannot be used, i.e. for an
+    empty network or non-finite throat values, which need the JSON encoder.
+    """
+    if (network.Np == 0) or (network.Nt == 0):
+        return None
+    squared_radius, coords, conns, link_length, link_squared_radius = \
+        _graph_columns(network)
+    if not np.isfinite(link_length + link_squared_radius).all():
+        return None
+    nodes = b',\n'.join([
+        _NODE_TEMPLATE % (i, r2, x, y, z)
+        for i, (r2, (x, y, z)) in enumerate(zip(squared_radius, coords))])
+    edges = b',\n'.join([
+        _EDGE_TEMPLATE % (i, source, target, L, r2)
+        for i, ((source, target), L, r2)
+        in enumerate(zip(conns, link_length, link_squared_radius))])
+    return _GRAPH_TEMPLATE % (network.Np, network.Nt, nodes, edges)
+
+
+def _graph_to_objects(network, graph_metadata_obj):
+    # Build the standard JGF 'graph' object with one entry per pore/throat
+    squared_radius, coords, conns, link_length, link_squared_radius = \
+        _graph_columns(network)
+    pore_ids = [str(i) for i in range(network.Np)]
+    throat_ids = [str(i) for i in range(network.Nt)]
+
+    # Create 'nodes' JSON object
+    nodes_obj = [
+        {
+            'id': ps,
+            'metadata': {
+                'node_squared_radius': r2,
+                'node_coordinates': {'x': x, 'y': y, 'z': z}
+            }
+        } for ps, r2, (x, y, z) in zip(pore_ids, squared_radius, coords)]
+
+    # Create 'edges' JSON object
+    edges_obj = [
+        {
+            'id': ts,
+            'source': str(source),
+            'target': str(target),
+            'metadata': {
+                'link_length': L,
+                'link_squared_radius': r2
+            }
+        } for ts, (source, target), L, r2
+        in zip(throat_ids, conns, link_length, link_squared_radius)]
+
+    # Build 'graph' JSON object from 'metadata', 'nodes' and 'edges'
+    return {'metadata': graph_metadata_obj,
+            'nodes': nodes_obj,
+            'edges': edges_obj}
+
+
+def _graph_from_objects(graph):
+    # Read the standard JGF per-node and per-edge objects into arrays.
+    # Extract node properties from JSON in one pass, then order them by id
+    nodes = graph['nodes']
+    node_ids = np.array([int(node['id']) for node in nodes], dtype=int)
+    coords = np.array(
+        [(c['x'], c['y'], c['z'])
+         for c in (node['metadata']['node_coordinates'] for node in nodes)]
+    ).reshape(-1, 3)
+    coords = coords[np.argsort(node_ids, kind='stable')]
+
+    # Extract link properties from JSON in one pass, then order them by id
+    edges = graph['edges']
+    edge_ids = np.array(
+        [(int(edge['id']), int(edge['source']), int(edge['target']))
+         for edge in edges], dtype=int).reshape(-1, 3)
+    edge_meta = np.array(
+        [(m['link_length'], m['link_squared_radius'])
+         for m in (edge['metadata'] for edge in edges)], dtype=float).reshape(-1, 2)
+    order = np.argsort(edge_ids[:, 0], kind='stable')
+    conns = edge_ids[order, 1:]
+    link_length, link_squared_radius = edge_meta[order].T
+
+    return coords, conns, link_length, link_squared_radius
+
+
+def network_to_jsongraph(network, filename='', fp=None, compact=False):
     r"""
     Write the network to disk as a JGF file.
 
@@ -38,10 +253,23 @@ def network_to_jsongraph(network, filename=''):
 
     filename : str
         Desired file name, defaults to network name if not given
-    """
+    fp : file-like object, optional
+        A binary file-like object (e.g. ``io.BytesIO``) to write the
+        encoded JSON to instead of ``filename``
+    compact : bool
+        If ``True``, the pore coordinates and throat properties are stored
+        as base64 encoded binary arrays in the graph metadata instead of
+        as per-node and per-edge objects. This is much faster to read and
+        write for large networks, but the data is only understood by
+        ``network_from_jsongraph``. The default is ``False``.
 
-    # Ensure output file is valid
-    filename = _parse_filename(filename=filename, ext='json')
+    Notes
+    -----
+    The standard form writes ``node_coordinates`` and ``node_squared_radius``
+    as integers, truncating the pore coordinates towards zero, so a pore at
+    ``[0.75, 0.75, 0.75]`` is read back at ``[0, 0, 0]``. The compact form
+    stores the coordinates as float64 and reads them back exactly.
+    """
 
     # Ensure network contains the required properties
     try:
@@ -56,46 +284,33 @@ def network_to_jsongraph(network, filename=''):
     graph_metadata_obj = {'number_of_nodes': network.Np,
                           'number_of_links': network.Nt}
 
-    # Create 'nodes' JSON object
-    nodes_obj = [
-        {
-            'id': str(ps),
-            'metadata': {
-                'node_squared_radius': int(network['pore.diameter'][ps] / 2)**2,
-                'node_coordinates': {
-                    'x': int(network['pore.coords'][ps, 0]),
-                    'y': int(network['pore.coords'][ps, 1]),
-                    'z': int(network['pore.coords'][ps, 2])
-                }
-            }
-        } for ps in network.Ps]
+    if compact:
+        graph_metadata_obj['arrays'] = {
+            'pore.coords': _encode_array(network['pore.coords'], '<f8'),
+            'throat.conns': _encode_array(network['throat.conns'], '<i8'),
+            'throat.length': _encode_array(network['throat.length'], '<f8'),
+            'throat.squared_radius': _encode_array(
+                (network['throat.diameter'] / 2)**2, '<f8'),
+        }
+        payload = _dumps({'graph': {'metadata': graph_metadata_obj}})
+    else:
+        # orjson encodes the dicts faster than the templates can be filled,
+        # so only render from templates in place of the stdlib encoder
+        payload = _render_graph(network) if orjson is None else None
+        if payload is None:
+            graph_obj = _graph_to_objects(network, graph_metadata_obj)
+            payload = _dumps({'graph': graph_obj})
 
-    # Create 'edges' JSON object
-    edges_obj = [
-        {
-            'id': str(ts),
-            'source': str(network['throat.conns'][ts, 0]),
-            'target': str(network['throat.conns'][ts, 1]),
-            'metadata': {
-                'link_length': float(network['throat.length'][ts]),
-                'link_squared_radius': float(network['throat.diameter'][ts] / 2)**2
-            }
-        } for ts in network.Ts]
-
-    # Build 'graph' JSON object from 'metadata', 'nodes' and 'edges'
-    graph_obj = {'metadata': graph_metadata_obj,
-                 'nodes': nodes_obj,
-                 'edges': edges_obj}
-
-    # Build full JSON object
-    json_obj = {'graph': graph_obj}
-
-    # Load and validate input JSON
-    with open(filename, 'w') as file:
-        json.dump(json_obj, file, indent=2)
+    # Write JSON to the given buffer or to disk
+    if fp is not None:
+        fp.write(payload)
+        return
+    filename = _parse_filename(filename=filename, ext='json')
+    with open(filename, 'wb') as file:
+        file.write(payload)
 
 
-def network_from_jsongraph(filename):
+def network_from_jsongraph(filename='', fp=None):
     r"""
     Loads the JGF file onto the given project.
 
@@ -104,6 +319,9 @@ def network_from_jsongraph(filename):
     filename : str
         The name of the file containing the data to import.  The formatting
         of this file is outlined below.
+    fp : file-like object, optional
+        A binary file-like object (e.g. ``io.BytesIO``) to read the encoded
+        JSON from instead of ``filename``
 
     Returns
     -------
@@ -112,32 +330,34 @@ def network_from_jsongraph(filename):
 
     """
 
-    # Ensure input file is valid
-    filename = _parse_filename(filename=filename, ext='json')
+    # Read the encoded JSON from the given buffer or from disk
+    if fp is not None:
+        payload = fp.read()
+    else:
+        filename = _parse_filename(filename=filename, ext='json')
+        with open(filename, 'rb') as file:
+            payload = file.read()
 
-    # Load and validate input JSON
-    with open(filename, 'r') as file:
-        json_file = json.load(file)
-        if not _validate_json(json_file):
-            raise Exception('File is not in the JSON Graph Format')
+    # Decode and validate input JSON
+    json_file = _loads(payload)
+    if not _validate_json(json_file):
+        raise Exception('File is not in the JSON Graph Format')
 
     # Extract graph metadata from JSON
     number_of_nodes = json_file['graph']['metadata']['number_of_nodes']
     number_of_links = json_file['graph']['metadata']['number_of_links']
 
-    # Extract node properties from JSON
-    nodes = sorted(json_file['graph']['nodes'], key=lambda node: int(node['id']))
-    x = np.array([node['metadata']['node_coordinates']['x'] for node in nodes])
-    y = np.array([node['metadata']['node_coordinates']['y'] for node in nodes])
-    z = np.array([node['metadata']['node_coordinates']['z'] for node in nodes])
-
-    # Extract link properties from JSON
-    edges = sorted(json_file['graph']['edges'], key=lambda edge: int(edge['id']))
-    source = np.array([int(edge['source']) for edge in edges])
-    target = np.array([int(edge['target']) for edge in edges])
-    link_length = np.array([edge['metadata']['link_length'] for edge in edges])
-    link_squared_radius = np.array(
-        [edge['metadata']['link_squared_radius'] for edge in edges])
+    # Extract pore and throat properties, either packed or per node/edge
+    arrays = json_file['graph']['metadata'].get('arrays')
+    if arrays is not None:
+        coords = _decode_array(arrays['pore.coords'], '<f8', (-1, 3))
+        conns = _decode_array(arrays['throat.conns'], '<i8', (-1, 2))
+        link_length = _decode_array(arrays['throat.length'], '<f8', -1)
+        link_squared_radius = _decode_array(
+            arrays['throat.squared_radius'], '<f8', -1)
+    else:
+        coords, conns, link_length, link_squared_radius = \
+            _graph_from_objects(json_file['graph'])
 
     # Generate network object
     network = Network()
@@ -146,12 +366,12 @@ def network_from_jsongraph(filename):
 
     # Define primitive throat properties
     network['throat.length'] = link_length
-    network['throat.conns'] = np.column_stack([source, target])
+    network['throat.conns'] = conns
     network['throat.diameter'] = 2.0 * np.sqrt(link_squared_radius)
 
     # Define primitive pore properties
     network['pore.index'] = np.arange(number_of_nodes)
-    network['pore.coords'] = np.column_stack([x, y, z])
+    network['pore.coords'] = coords
     network['pore.diameter'] = np.zeros(number_of_nodes)
 
     return network
@@ -0,0 +1,99 @@
+import sys
+from types import MappingProxyType
+import openpnm.models as mods
+
+
+def _intern(obj):
+    r"""
+    Interns the dict keys and property names in a collection so that lookups
+    on these names elsewhere can short-circuit on identity.
+    """
+    if isinstance(obj, dict):
+        return {_intern(k): _intern(v) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [_intern(v) for v in obj]
+    if isinstance(obj, str) and len(obj) <= 32 and ('.' in obj or '_' in obj):
+        return sys.intern(obj)
+    return obj
+
+
+# Models shared by all geometry collections. The entries are shared between
+# collections, which is safe since get_model_collection copies each of them
+COMMON_GEOMETRY_MODELS = MappingProxyType(_intern({
+    'pore.seed': {
+        'model': mods.misc.random,
+        'element': 'pore',
+        'num_range': [0.2, 0.7],
+        'seed': None,
+    },
+    'pore.max_size': {
+        'model': mods.geometry.pore_size.largest_sphere,
+        'iters': 10,
+    },
+    'pore.diameter': {
+        'model': mods.misc.product,
+        'props': ['pore.max_size', 'pore.seed'],
+    },
+    'throat.max_size': {
+        'model': mods.misc.from_neighbor_pores,
+        'mode': 'min',
+        'prop': 'pore.diameter',
+    },
+    'throat.diameter': {
+        'model': mods.misc.scaled,
+        'factor': 0.5,
+        'prop': 'throat.max_size',
+    },
+}))
+
+
+def _make_collection(pore_volume, throat_length, throat_area, throat_volume,
+                     diffusive_sf, hydraulic_sf, throat_volume_first=False):
+    r"""
+    Builds a geometry collection from the models that define the shape of
+    the pores and throats, added to ``COMMON_GEOMETRY_MODELS``. The result
+    is a read-only template for ``get_model_collection``.
+
+    The models are listed pore models first, in the order each collection
+    has always used, since this is the order ``net.models`` iterates and
+    prints in. ``throat_volume_first`` puts ``throat.volume`` before
+    ``throat.cross_sectional_area``, as some collections have it.
+    """
+    throat_props = ['throat.cross_sectional_area', 'throat.volume']
+    if throat_volume_first:
+        throat_props.reverse()
+    order = ['pore.seed', 'pore.max_size', 'pore.diameter', 'pore.volume',
+             'throat.max_size', 'throat.diameter', 'throat.length',
+             *throat_props,
+             'throat.diffusive_size_factors', 'throat.hydraulic_size_factors']
+    models = {**COMMON_GEOMETRY_MODELS, **_intern({
+        'pore.volume': {
+            'model': pore_volume,
+            'pore_diameter': 'pore.diameter',
+        },
+        'throat.length': {
+            'model': throat_length,
+            'pore_diameter': 'pore.diameter',
+            'throat_diameter': 'throat.diameter',
+        },
+        'throat.cross_sectional_area': {
+            'model': throat_area,
+            'throat_diameter': 'throat.diameter',
+        },
+        'throat.volume': {
+            'model': throat_volume,
+            'throat_diameter': 'throat.diameter',
+            'throat_length': 'throat.length',
+        },
+        'throat.diffusive_size_factors': {
+            'model': diffusive_sf,
+            'pore_diameter': 'pore.diameter',
+            'throat_diameter': 'throat.diameter',
+        },
+        'throat.hydraulic_size_factors': {
+            'model': hydraulic_sf,
+            'pore_diameter': 'pore.diameter',
+            'throat_diameter': 'throat.diameter',
+        },
+    })}
+    return MappingProxyType({k: models[k] for k in order})
@@ -56,17 +56,18 @@ def ad_dif(
     P = phase[pore_pressure]
     gh = phase[throat_hydraulic_conductance][throats]
     gd = phase[throat_diffusive_conductance][throats]
+    # Columns hold the values for the conns and reverse-conns directions
     if gd.size == throats.size:
-        gd = _np.tile(gd, 2)
+        gd = gd.reshape(-1, 1)  # Broadcasts over both directions
     # Special treatment when gd is not Nt by 1 (ex. mass partitioning)
     elif gd.size == 2 * throats.size:
-        gd = gd.reshape(throats.size * 2, order='F')
+        gd = gd.reshape(throats.size, 2, order='F')
     else:
         raise Exception(f"Shape of {throat_diffusive_conductance} must either"
                         r" be (Nt,1) or (Nt,2)")
 
     Qij = -gh * _np.diff(P[cn], axis=1).squeeze()
-    Qij = _np.append(Qij, -Qij)
+    Qij = _np.stack((Qij, -Qij), axis=1)
 
     Peij = Qij / gd
     Peij[(Peij < 1e-10) & (Peij >= 0)] = 1e-10
@@ -86,5 +87,4 @@ def ad_dif(
         w = -Qij / (1 - _np.exp(Peij))
     else:
         raise Exception('Unrecognized discretization scheme: ' + s_scheme)
-    w = w.reshape(throats.size, 2, order='F')
     return w
@@ -83,16 +83,17 @@ def ad_dif_mig(target,
     # .T below is for when gd is (Nt, 2) instead of (Nt, 1)
     gm = (gd.T * (z * F) / (R * T)).T
     delta_V = _np.diff(V[cn], axis=1).squeeze()
-    delta_V = _np.append(delta_V, -delta_V)
+    delta_V = _np.stack((delta_V, -delta_V), axis=1)
 
+    # Columns hold the values for the conns and reverse-conns directions
     # Normal treatment when gd is Nt by 1
     if gd.size == throats.size:
-        gd = _np.tile(gd, 2)
-        gm = _np.tile(gm, 2)
+        gd = gd.reshape(-1, 1)  # Broadcasts over both directions
+        gm = gm.reshape(-1, 1)
     # Special treatment when gd is not Nt by 1 (ex. mass partitioning)
     elif gd.size == 2 * throats.size:
-        gd = gd.reshape(throats.size * 2, order="F")
-        gm = gm.reshape(throats.size * 2, order="F")
+        gd = gd.reshape(throats.size, 2, order="F")
+        gm = gm.reshape(throats.size, 2, order="F")
     else:
         raise Exception(f"Shape of {throat_diffusive_conductance} must either"
                         r" be (Nt,1) or (Nt,2)")
@@ -102,7 +103,7 @@ def ad_dif_mig(target,
 
     # Advection
     Qij = -gh * _np.diff(P[cn], axis=1).squeeze()
-    Qij = _np.append(Qij, -Qij)
+    Qij = _np.stack((Qij, -Qij), axis=1)
 
     # Advection-migration
     adv_mig = Qij - mig
@@ -139,5 +140,4 @@ def ad_dif_mig(target,
         w = -adv_mig / (1 - _np.exp(Peij_adv_mig))
     else:
         raise Exception("Unrecognized discretization scheme: " + s_scheme)
-    w = w.reshape(throats.size, 2, order="F")
     return w
@@ -1,5 +1,8 @@
+import functools as _functools
 import numpy as _np
 import scipy as _sp
+from math import exp
+from numba import njit
 from openpnm.models import _doctxt
 
 
@@ -18,6 +21,11 @@ __all__ = [
 ]
 
 
+# Physical constants used by the Butler-Volmer models, looked up only once
+_F = _sp.constants.physical_constants["Faraday constant"][0]
+_R = _sp.constants.R
+
+
 @_doctxt
 def charge_conservation(target, phase, p_alg, e_alg, assumption):
     r"""
@@ -60,32 +68,37 @@ def charge_conservation(target, phase, p_alg, e_alg, assumption):
 
     """
     assumption = assumption.lower()
-    import scipy.sparse.csgraph as _spgr
 
     F = 96485.3321233100184
     rhs = _np.zeros(shape=(p_alg.Np, ), dtype=float)
     network = p_alg.project.network
-    if assumption == 'poisson':
-        v = network['pore.volume']
-        for e in e_alg:
-            rhs += (v * F * phase['pore.valence.'+e.settings['ion']]
-                    * e[e.settings['quantity']])
-    elif assumption == 'poisson_2d':
-        s = network['pore.cross_sectional_area']
+    buf = _np.empty_like(rhs)
+    if assumption in ['poisson', 'poisson_2d']:
+        if assumption == 'poisson':
+            v = network['pore.volume']
+        else:
+            v = network['pore.cross_sectional_area']
+        vF = v * F
         for e in e_alg:
-            rhs += (s * F * phase['pore.valence.'+e.settings['ion']]
-                    * e[e.settings['quantity']])
+            ion, quantity = e.settings['ion'], e.settings['quantity']
+            z = phase['pore.valence.'+ion]
+            _np.multiply(vF, z, out=buf)
+            buf *= e[quantity]
+            rhs += buf
     elif assumption in ['electroneutrality', 'electroneutrality_2d']:
+        c, g, z = [], [], []
         for e in e_alg:
-            try:
-                c = e[e.settings['quantity']]
-            except KeyError:
-                c = _np.zeros(shape=(e.Np, ), dtype=float)
-            network = e.project.network
-            g = phase['throat.diffusive_conductance.'+e.settings['ion']]
-            am = network.create_adjacency_matrix(weights=g, fmt='coo')
-            A = _spgr.laplacian(am)
-            rhs += - F * phase['pore.valence.'+e.settings['ion']] * (A * c)
+            ion, quantity = e.settings['ion'], e.settings['quantity']
+            if quantity in e.keys():
+                c.append(e[quantity])
+            else:  # The species has not been solved for yet
+                c.append(_np.zeros(shape=(e.Np, ), dtype=float))
+            g.append(phase['throat.diffusive_conductance.'+ion])
+            z.append(phase['pore.valence.'+ion])
+        if len(c):
+            # All species are handled in one pass over the throats
+            Lc = _laplacian_dot(network, g, c)
+            rhs -= F * _np.einsum('ij,ij->i', Lc, _np.column_stack(z))
     elif assumption in ['laplace', 'laplace_2d']:
         pass  # rhs should remain 0
     else:
@@ -97,6 +110,51 @@ def charge_conservation(target, phase, p_alg, e_alg, assumption):
     return values
 
 
+def _laplacian_dot(network, g, c):
+    r"""
+    Returns the product of the graph laplacian weighted by ``g`` and ``c``,
+    the same as ``csgraph.laplacian(am) @ c`` for the weighted adjacency
+    matrix ``am``. The matrix is never formed, the product is accumulated
+    in a single pass over the throats instead.
+
+    ``g`` and ``c`` can also be lists holding the conductance and quantity
+    of several species, in which case the products for all species are
+    returned as the columns of an Np-by-k array.
+    """
+    single = not isinstance(c, list)
+    if single:
+        g, c = [g], [c]
+    Nt = network.Nt
+    g_ij = _np.empty((Nt, len(g)), dtype=float)
+    g_ji = _np.empty((Nt, len(g)), dtype=float)
+    for s, gs in enumerate(g):
+        gs = _np.asarray(gs, dtype=float)
+        if gs.ndim == 2:
+            g_ij[:, s], g_ji[:, s] = gs[:, 0], gs[:, 1]
+        elif gs.size == Nt:
+            g_ij[:, s] = g_ji[:, s] = gs
+        else:
+            g_ij[:, s], g_ji[:, s] = gs[:Nt], gs[Nt:]
+    c = _np.column_stack(c).astype(float, copy=False)
+    Lc = _np.zeros_like(c)
+    _laplacian_dot_kernel(network['throat.conns'], g_ij, g_ji, c, Lc)
+    return Lc[:, 0] if single else Lc
+
+
+def _as_scalar_if_uniform(a):
+    r"""
+    Returns the array as a scalar if it has the same value everywhere, as
+    is typical of coefficients. Elementwise functions of a scalar such as
+    ``log(B)`` are then evaluated once, and NumPy evaluates powers with a
+    scalar exponent much faster, using plain multiplication for small
+    integers, than with an array of exponents.
+    """
+    a = _np.asarray(a)
+    if a.ndim and a.size and _np.all(a == a.flat[0]):
+        return a.flat[0]
+    return a
+
+
 @_doctxt
 def standard_kinetics(target, X, prefactor, exponent):
     r"""
@@ -142,9 +200,11 @@ def standard_kinetics(target, X, prefactor, exponent):
     A = target[prefactor]
     b = target[exponent]
 
-    r = A*(X**b)
+    b = _as_scalar_if_uniform(b)
+    xb = X**b
+    r = A*xb
     S1 = A*b*(X**(b - 1))
-    S2 = A*(1 - b)*(X**b)
+    S2 = A*(1 - b)*xb
     values = {'S1': S1, 'S2': S2, 'rate': r}
     return values
 
@@ -189,9 +249,19 @@ def linear(target, X, A1=0.0, A2=0.0):
             rate = S_{1} X + S_{2}
 
     """
-    r = target[A1] * target[X] + target[A2]
     S1 = target[A1]
     S2 = target[A2]
+    X = target[X]
+    if not _np.any(S1):
+        # A zero slope (i.e. a term switched off) leaves only the intercept
+        r = _np.broadcast_to(S2, _np.broadcast(S1, X, S2).shape)
+        r = r.astype(_np.result_type(S1, X, S2))
+    elif _np.result_type(S1, X, S2) == _np.result_type(S1, X):
+        # Add the intercept in place when that doesn't truncate its dtype
+        r = S1 * X
+        r += S2
+    else:
+        r = S1 * X + S2
     values = {'S1': S1, 'S2': S2, 'rate': r}
     return values
 
@@ -241,9 +311,11 @@ def power_law(target, X, A1=0.0, A2=0.0, A3=0.0):
     C = target[A3]
     X = target[X]
 
-    r = A * X ** B + C
+    B = _as_scalar_if_uniform(B)
+    xB = X ** B
+    r = A * xB + C
     S1 = A * B * X ** (B - 1)
-    S2 = A * X ** B * (1 - B) + C
+    S2 = A * xB * (1 - B) + C
     values = {'S1': S1, 'S2': S2, 'rate': r}
     return values
 
@@ -296,9 +368,14 @@ def exponential(target, X, A1=0.0, A2=1.0, A3=1.0, A4=1.0, A5=0.0, A6=0.0):
     F = target[A6]
     X = target[X]
 
-    r = A * B ** (C * X ** D + E) + F
-    S1 = A * C * D * X ** (D - 1) * _np.log(B) * B ** (C * X ** D + E)
-    S2 = A * B ** (C * X ** D + E) * (1 - C * D * _np.log(B) * X ** D) + F
+    # Evaluate the shared subexpressions once
+    B = _as_scalar_if_uniform(B)
+    xD = X ** D
+    Aexp = A * B ** (C * xD + E)
+    CDlnB = C * D * _np.log(B)
+    r = Aexp + F
+    S1 = CDlnB * X ** (D - 1) * Aexp
+    S2 = Aexp * (1 - CDlnB * xD) + F
     values = {'S1': S1, 'S2': S2, 'rate': r}
     return values
 
@@ -350,9 +427,13 @@ def natural_exponential(target, X, A1=0.0, A2=0.0, A3=0.0, A4=0.0, A5=0.0):
     E = target[A5]
     X = target[X]
 
-    r = A * _np.exp(B * X ** C + D) + E
-    S1 = A * B * C * X ** (C - 1) * _np.exp(B * X ** C + D)
-    S2 = A * (1 - B * C * X ** C) * _np.exp(B * X ** C + D) + E
+    # Evaluate the shared subexpressions once
+    xC = X ** C
+    Aexp = A * _np.exp(B * xC + D)
+    BC = B * C
+    r = Aexp + E
+    S1 = BC * X ** (C - 1) * Aexp
+    S2 = (1 - BC * xC) * Aexp + E
     values = {'pore.S1': S1, 'pore.S2': S2, 'pore.rate': r}
     return values
 
@@ -405,10 +486,14 @@ def logarithm(target, X, A1=0.0, A2=10.0, A3=1.0, A4=1.0, A5=0.0, A6=0.0):
     F = target[A6]
     X = target[X]
 
-    r = (A * _np.log(C * X ** D + E)/_np.log(B) + F)
-    S1 = A * C * D * X ** (D - 1) / (_np.log(B) * (C * X ** D + E))
-    S2 = A * _np.log(C * X ** D + E) / _np.log(B) + F - A * C * D * X ** D / \
-        (_np.log(B) * (C * X ** D + E))
+    # Evaluate the shared subexpressions once
+    xD = X ** D
+    inner = C * xD + E
+    lnB = _np.log(_as_scalar_if_uniform(B))
+    ACD = A * C * D / (lnB * inner)
+    r = A * _np.log(inner) / lnB + F
+    S1 = ACD * X ** (D - 1)
+    S2 = r - ACD * xD
     values = {'S1': S1, 'S2': S2, 'rate': r}
     return values
 
@@ -460,26 +545,41 @@ def natural_logarithm(target, X, A1=0.0, A2=1.0, A3=1.0, A4=0.0, A5=0.0):
     E = target[A5]
     X = target[X]
 
-    r = A*_np.log(B*X**C + D) + E
-    S1 = A*B*C*X**(C - 1) / (B * X ** C + D)
-    S2 = A*_np.log(B*X**C + D) + E - A*B*C*X**C / (B*X**C + D)
+    # Evaluate the shared subexpressions once
+    xC = X**C
+    inner = B*xC + D
+    ABC = A*B*C / inner
+    r = A*_np.log(inner) + E
+    S1 = ABC*X**(C - 1)
+    S2 = r - ABC*xC
     values = {'pore.S1': S1, 'pore.S2': S2, 'pore.rate': r}
     return values
 
 
 def _build_func(eq, **args):
     r"""
-    Take a symbolic equation and return the lambdified version plus the
-    linearization of form S1 * x + S2
+    Take a symbolic equation and return a lambdified function that evaluates
+    it together with its linearization of form S1 * x + S2, returning
+    ``[rate, S1, S2]``. Common subexpressions are pulled out across all three
+    so that each one is evaluated, and allocated, only once.
     """
     from sympy import lambdify
     eq_prime = eq.diff(args['x'])
     s1 = eq_prime
     s2 = eq - eq_prime*args['x']
-    EQ = lambdify(args.values(), expr=eq, modules='numpy')
-    S1 = lambdify(args.values(), expr=s1, modules='numpy')
-    S2 = lambdify(args.values(), expr=s2, modules='numpy')
-    return EQ, S1, S2
+    return lambdify(args.values(), expr=[eq, s1, s2], modules='numpy', cse=True)
+
+
+@_functools.lru_cache(maxsize=128)
+def _compile_eqn(eqn, names):
+    r"""
+    Parses the equation and builds the lambdified function for its rate and
+    linearization, with arguments in the order given by ``names``. The result is cached
+    since sympy is far slower than evaluating the resulting functions.
+    """
+    from sympy import symbols, sympify
+    args = {k: symbols(k) for k in names}
+    return _build_func(sympify(eqn), **args)
 
 
 @_doctxt
@@ -523,21 +623,15 @@ def general_symbolic(target, eqn, x, **kwargs):
     ...                 eqn=y, x='pore.x', **arg_map)
 
     """
-    from sympy import symbols, sympify
-    eqn = sympify(eqn)
     # Get the data
     data = {'x': target[x]}
-    args = {'x': symbols('x')}
     for key in kwargs.keys():
         if isinstance(kwargs[key], str):
             data[key] = target[kwargs[key]]
         else:
             data[key] = kwargs[key]
-        args[key] = symbols(key)
-    r, s1, s2 = _build_func(eqn, **args)
-    r_val = r(*data.values())
-    s1_val = s1(*data.values())
-    s2_val = s2(*data.values())
+    func = _compile_eqn(eqn, tuple(data.keys()))
+    r_val, s1_val, s2_val = func(*data.values())
     values = {'S1': s1_val, 'S2': s2_val, 'rate': r_val}
     return values
 
@@ -660,19 +754,14 @@ def butler_volmer_conc(
     phi_soln = target[electrolyte_voltage]
     U_eq = target[open_circuit_voltage]
     A_rxn = network[reaction_area][pores]
-    F = _sp.constants.physical_constants["Faraday constant"][0]
-    R = _sp.constants.R
+    F, R = _F, _R
     # Linearize with respect to X (electrolyte concentration)
-    eta_s = phi_met - phi_soln - U_eq
-    cte = i0_ref * A_rxn / (n * F)
-    m1 = (1-beta) * n * F / (R * T)
-    m2 = beta * n * F / (R * T)
-    fV = _np.exp(m1 * eta_s) - _np.exp(-m2 * eta_s)
-    fC = (X / c_ref)**gamma
-    r = cte * fC * fV
-    drdC = cte * (X / c_ref)**(gamma - 1) * (1 / c_ref) * fV
-    S1 = drdC
-    S2 = r - drdC * X
+    X, T, phi_met, phi_soln, U_eq, A_rxn = _as_float_arrays(
+        X, T, phi_met, phi_soln, U_eq, A_rxn)
+    S1, S2, r = _np.empty_like(X), _np.empty_like(X), _np.empty_like(X)
+    _butler_volmer_conc_kernel(X, T, phi_met, phi_soln, U_eq, A_rxn,
+                               float(n), F, R, float(i0_ref), float(c_ref),
+                               float(beta), float(gamma), S1, S2, r)
 
     values = {"S1": S1, "S2": S2, "rate": r}
     return values
@@ -795,21 +884,65 @@ def butler_volmer_voltage(
     c = target[electrolyte_concentration]
     T = target[temperature]
     X = target[X]
-    F = _sp.constants.physical_constants["Faraday constant"][0]
-    R = _sp.constants.R
+    F, R = _F, _R
 
     # Linearize with respect to X (electrolyte voltage)
-    eta_s = phi_met - X - U_eq
-    cte = i0_ref * A_rxn
-    m1 = (1-beta) * n * F / (R * T)
-    m2 = beta * n * F / (R * T)
-    fV = _np.exp(m1 * eta_s) - _np.exp(-m2 * eta_s)
-    dfVdV = -(m1 * _np.exp(m1 * eta_s) + m2 * _np.exp(-m2 * eta_s))
-    fC = (c / c_ref)**gamma
-    r = cte * fC * fV
-    drdV = cte * fC * dfVdV
-    S1 = drdV
-    S2 = r - drdV * X
+    X, T, phi_met, c, U_eq, A_rxn = _as_float_arrays(
+        X, T, phi_met, c, U_eq, A_rxn)
+    S1, S2, r = _np.empty_like(X), _np.empty_like(X), _np.empty_like(X)
+    _butler_volmer_voltage_kernel(X, T, phi_met, c, U_eq, A_rxn,
+                                  float(n), F, R, float(i0_ref), float(c_ref),
+                                  float(beta), float(gamma), S1, S2, r)
 
     values = {"S1": S1, "S2": S2, "rate": r}
     return values
+
+
+def _as_float_arrays(*arrays):
+    r"""
+    Broadcasts the given values against each other as float arrays, so they
+    can be passed to the compiled kernels below.
+    """
+    arrays = _np.broadcast_arrays(*[_np.asarray(a, dtype=float) for a in arrays])
+    return [_np.atleast_1d(a) for a in arrays]
+
+
+@njit
+def _butler_volmer_conc_kernel(X, T, phi_met, phi_soln, U_eq, A_rxn,
+                               n, F, R, i0_ref, c_ref, beta, gamma, S1, S2, r):
+    # Single pass over the pores, writing into the preallocated outputs
+    for i in range(X.shape[0]):
+        eta_s = phi_met[i] - phi_soln[i] - U_eq[i]
+        m1 = (1-beta) * n * F / (R * T[i])
+        m2 = beta * n * F / (R * T[i])
+        fV = i0_ref * A_rxn[i] / (n * F) * (exp(m1 * eta_s) - exp(-m2 * eta_s))
+        r[i] = (X[i] / c_ref)**gamma * fV
+        S1[i] = (X[i] / c_ref)**(gamma - 1) * fV / c_ref
+        S2[i] = r[i] - S1[i] * X[i]
+
+
+@njit
+def _butler_volmer_voltage_kernel(X, T, phi_met, c, U_eq, A_rxn,
+                                  n, F, R, i0_ref, c_ref, beta, gamma, S1, S2, r):
+    # Single pass over the pores, writing into the preallocated outputs
+    for i in range(X.shape[0]):
+        eta_s = phi_met[i] - X[i] - U_eq[i]
+        cte = i0_ref * A_rxn[i] * (c[i] / c_ref)**gamma
+        m1 = (1-beta) * n * F / (R * T[i])
+        m2 = beta * n * F / (R * T[i])
+        e1 = exp(m1 * eta_s)
+        e2 = exp(-m2 * eta_s)
+        r[i] = cte * (e1 - e2)
+        S1[i] = -cte * (m1 * e1 + m2 * e2)
+        S2[i] = r[i] - S1[i] * X[i]
+
+
+@njit
+def _laplacian_dot_kernel(conns, g_ij, g_ji, c, Lc):
+    # The laplacian is D - A, with D holding the column sums of A. Each
+    # column of c is a separate species with its own conductances
+    for k in range(conns.shape[0]):
+        i, j = conns[k, 0], conns[k, 1]
+        for s in range(c.shape[1]):
+            Lc[i, s] += g_ji[k, s]*c[i, s] - g_ij[k, s]*c[j, s]
+            Lc[j, s] += g_ij[k, s]*c[j, s] - g_ji[k, s]*c[i, s]
@@ -54,8 +54,13 @@ class Delaunay(Network):
         points = tools.parse_points(shape=shape, points=points)
         net, tri = delaunay(points=points, shape=shape,
                             node_prefix='pore', edge_prefix='throat')
+        # Points are not trimmed before tessellating since removing points
+        # can add edges between the remaining ones, so the result would differ
         Ps = isoutside(net, shape=shape)
-        net = trim_nodes(g=net, inds=Ps)
+        if Ps.any():
+            net = trim_nodes(g=net, inds=Ps)
+        else:
+            net['throat.conns'] = net['throat.conns'].astype(int)
         self.update(net)
 
 
@@ -116,6 +116,9 @@ class Network(Domain):
             if np.any(value[:, 0] > value[:, 1]):
                 logger.debug('Converting throat.conns to be upper triangular')
                 value = np.sort(value, axis=1)
+            # Cached matrices are no longer valid for the new topology
+            self._am.clear()
+            self._im.clear()
         super().__setitem__(key, value)
 
     def get_adjacency_matrix(self, fmt='coo'):
@@ -261,24 +264,18 @@ class Network(Domain):
             raise Exception('Received weights are of incorrect length')
         weights = np.array(weights)
 
-        # Append row & col to each other, and data to itself
-        conn = self['throat.conns']
-        row = conn[:, 0]
-        col = conn[:, 1]
-        if weights.shape == (2 * self.Nt):
-            # The flip is necessary since we want [conns.T, reverse(conns).T].T
-            row = np.append(row, conn[:, 1])
-            col = np.append(col, conn[:, 0])
-        elif weights.shape == (self.Nt, 2):
-            # The flip is necessary since we want [conns.T, reverse(conns).T].T
-            row = np.append(row, conn[:, 1])
-            col = np.append(col, conn[:, 0])
-            weights = weights.flatten(order='F')
-        elif not triu:
-            # The flip is necessary since we want [conns.T, reverse(conns).T].T
-            row = np.append(row, conn[:, 1])
-            col = np.append(col, conn[:, 0])
-            weights = np.append(weights, weights)
+        if triu and weights.shape == (self.Nt, ):
+            conn = self['throat.conns']
+            row = conn[:, 0]
+            col = conn[:, 1]
+        else:
+            # Reuse row & col of the cached adjacency matrix since they only
+            # depend on the topology, then append data to itself
+            row, col = self._get_am_topology()
+            if weights.shape == (self.Nt, 2):
+                weights = weights.flatten(order='F')
+            elif weights.shape == (self.Nt, ):
+                weights = np.append(weights, weights)
 
         # Generate sparse adjacency matrix in 'coo' format
         temp = sprs.coo_matrix((weights, (row, col)), (self.Np, self.Np))
@@ -298,6 +295,22 @@ class Network(Domain):
 
         return temp
 
+    def _get_am_topology(self):
+        r"""
+        Returns the row and col arrays of the full (i.e. not triu)
+        adjacency matrix in 'coo' format, creating and caching it if needed
+        """
+        if 'coo' not in self._am.keys():
+            # The flip is necessary since we want [conns.T, reverse(conns).T].T
+            conn = self['throat.conns']
+            row = np.append(conn[:, 0], conn[:, 1])
+            col = np.append(conn[:, 1], conn[:, 0])
+            data = np.append(self.Ts, self.Ts)
+            am = sprs.coo_matrix((data, (row, col)), (self.Np, self.Np))
+            self._am['coo'] = am
+        am = self._am['coo']
+        return am.row, am.col
+
     def create_incidence_matrix(self, weights=None, fmt='coo',
                                 drop_zeros=False):
         r"""
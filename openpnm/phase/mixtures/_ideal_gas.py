@@ -5,6 +5,7 @@ import openpnm.models as mods
 from openpnm.utils import Docorator
 docstr = Docorator()
 logger = logging.getLogger(__name__)
+_ideal_gas = mods.phase.molar_density.ideal_gas
 
 
 @docstr.dedent
@@ -21,6 +22,8 @@ class IdealGas(GenericMixture):
 
     def __init__(self, name='mix_#', **kwargs):
         super().__init__(name=name, **kwargs)
-        self.add_model(propname='pore.molar_density',
-                       model=mods.phase.molar_density.ideal_gas,
-                       regen_mode='deferred')
+        # Don't replace a molar density model set up by a parent class
+        if 'pore.molar_density@all' not in self.models.keys():
+            self.add_model(propname='pore.molar_density',
+                           model=_ideal_gas,
+                           regen_mode='deferred')
@@ -15,7 +15,15 @@ class BaseSolver:
 
 class DirectSolver(BaseSolver):
     """Brief description of 'DirectSolver'"""
-    ...
+
+    def symbolic_factor(self, A):
+        r"""
+        Returns an opaque handle to the symbolic analysis of ``A``, which
+        can be passed to ``solve`` as ``sym`` to skip the analysis step
+        for matrices with the same sparsity pattern. Returns ``None`` if
+        the underlying solver doesn't support this.
+        """
+        return None
 
 
 class IterativeSolver(BaseSolver):
@@ -56,6 +64,6 @@ class IterativeSolver(BaseSolver):
     def _get_residual(self, A, b, x):
         r"""
         Calculates the residual based on the given ``x`` using:
-            ``res = norm(A*x - b)``
+            ``res = norm(A.dot(x) - b)``
         """
-        return norm(A * x - b)
+        return norm(A.dot(x) - b)
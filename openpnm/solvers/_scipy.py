@@ -1,15 +1,151 @@
+import inspect
+import numpy as np
 from scipy.sparse import csr_matrix, csc_matrix
-from scipy.sparse.linalg import spsolve
-from openpnm.solvers import DirectSolver
+from scipy.sparse.linalg import spsolve, splu, spilu, bicgstab
+from scipy.sparse.linalg import LinearOperator
+from openpnm.solvers import DirectSolver, IterativeSolver
 
-__all__ = ['ScipySpsolve']
+__all__ = ['ScipySpsolve', 'ScipyBicgstabILU']
+
+# SciPy 1.12 renamed bicgstab's 'tol' to 'rtol', and 1.14 removed 'tol'
+_RTOL_KW = 'rtol' if 'rtol' in inspect.signature(bicgstab).parameters else 'tol'
 
 
 class ScipySpsolve(DirectSolver):
     """Brief description of 'ScipySpsolve'"""
 
-    def solve(self, A, b, **kwargs):
+    def __init__(self):
+        super().__init__()
+        self._factor = None
+
+    def symbolic_factor(self, A):
+        r"""
+        Returns the fill-reducing ordering of ``A`` computed by SuperLU.
+
+        Notes
+        -----
+        The returned permutation only depends on the sparsity pattern of
+        ``A``, so it can be passed back to ``solve`` via the ``sym``
+        argument for any matrix with the same pattern, in which case the
+        ordering step is skipped and only the numeric factorization is
+        performed.
+
+        Finding the ordering requires a full factorization of ``A``, so it
+        is kept and reused by the next ``solve`` call if ``A`` is unchanged.
+
+        """
+        A = csr_matrix(A)
+        lu = splu(A.tocsc(), permc_spec='MMD_AT_PLUS_A',
+                  options={'SymmetricMode': True})
+        sym = np.argsort(lu.perm_c)
+        self._factor = (A.copy(), sym, lu.solve)
+        return sym
+
+    def solve(self, A, b, sym=None, **kwargs):
         """Brief description of 'solve'"""
-        if not isinstance(A, (csr_matrix, csc_matrix)):
-            A = A.tocsr()
-        return (spsolve(A, b), 0)
+        if sym is None:
+            if not isinstance(A, (csr_matrix, csc_matrix)):
+                A = A.tocsr()
+            return (spsolve(A, b), 0)
+        A = csr_matrix(A)
+        # Numeric factorization is also skipped if A hasn't changed
+        if not self._is_factorized(A, sym):
+            # Apply the cached ordering symmetrically and skip reordering
+            Ap = A[sym].tocsc()[:, sym]
+            lu = splu(Ap, permc_spec='NATURAL',
+                      options={'SymmetricMode': True})
+            self._factor = (A.copy(), sym, self._permuted_solve(lu, sym))
+        x = self._factor[2](b)
+        return (x, 0)
+
+    @staticmethod
+    def _permuted_solve(lu, sym):
+        # Wraps the factorization of A[sym][:, sym] to solve for A itself
+        def solve(b):
+            x = np.empty_like(b, dtype=float)
+            x[sym] = lu.solve(b[sym])
+            return x
+        return solve
+
+    def _is_factorized(self, A, sym):
+        r"""
+        Checks whether the cached factorization was computed for the given
+        ``A`` using the given ordering ``sym``.
+        """
+        if self._factor is None:
+            return False
+        B, sym_old, _ = self._factor
+        return (sym is sym_old) and (B.shape == A.shape) \
+            and (B.nnz == A.nnz) \
+            and np.array_equal(B.indptr, A.indptr) \
+            and np.array_equal(B.indices, A.indices) \
+            and np.array_equal(B.data, A.data)
+
+
+class ScipyBicgstabILU(IterativeSolver):
+    r"""
+    Solves the sparse linear system Ax = b using BiCGStab preconditioned
+    with an incomplete LU factorization of ``A``.
+
+    Parameters
+    ----------
+    tol : float
+        Relative tolerance of the residual
+    maxiter : int
+        Maximum number of iterations
+    drop_tol : float
+        Drop tolerance passed to ``spilu``
+    fill_factor : float
+        Fill factor passed to ``spilu``
+    rebuild_tol : float
+        The preconditioner is rebuilt only if the relative change in the
+        values of ``A`` since it was last built exceeds this value.
+
+    Notes
+    -----
+    The preconditioner is cached between calls to ``solve`` and reused
+    as long as the sparsity pattern of ``A`` is unchanged and its values
+    haven't changed materially, so iterative algorithms only pay for the
+    incomplete factorization once. The solution of the previous call is
+    used as the initial guess if ``x0`` is not given.
+
+    """
+
+    def __init__(self, tol=1e-8, maxiter=5000, drop_tol=1e-4,
+                 fill_factor=10, rebuild_tol=0.1):
+        super().__init__(tol=tol, maxiter=maxiter)
+        self.drop_tol = drop_tol
+        self.fill_factor = fill_factor
+        self.rebuild_tol = rebuild_tol
+        self._M = None
+        self._x = None
+
+    def solve(self, A, b, x0=None, **kwargs):
+        """Brief description of 'solve'"""
+        A = csr_matrix(A)
+        if self._needs_preconditioner(A):
+            ilu = spilu(A.tocsc(), drop_tol=self.drop_tol,
+                        fill_factor=self.fill_factor)
+            M = LinearOperator(A.shape, matvec=ilu.solve)
+            self._M = (A.copy(), M)
+        if x0 is None and self._x is not None and self._x.size == b.size:
+            x0 = self._x
+        x, info = bicgstab(A, b, x0=x0, M=self._M[1], atol=0.0,
+                           maxiter=self.maxiter, **{_RTOL_KW: self.tol})
+        self._x = x
+        return (x, info)
+
+    def _needs_preconditioner(self, A):
+        r"""
+        Checks whether the cached preconditioner is missing or was built
+        for a matrix that differs materially from the given ``A``.
+        """
+        if self._M is None:
+            return True
+        B = self._M[0]
+        if (B.shape != A.shape) or (B.nnz != A.nnz) \
+                or not np.array_equal(B.indptr, A.indptr) \
+                or not np.array_equal(B.indices, A.indices):
+            return True
+        change = np.linalg.norm(A.data - B.data) / np.linalg.norm(B.data)
+        return change > self.rebuild_tol
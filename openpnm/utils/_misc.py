@@ -9,7 +9,7 @@ import scipy.sparse as sparse
 from collections import OrderedDict
 from collections.abc import Iterable
 from docrep import DocstringProcessor
-from copy import deepcopy
+from copy import copy
 
 
 __all__ = [
@@ -625,12 +625,16 @@ def remove_prop_deep(obj, propname):
 
 
 def get_model_collection(collection, regen_mode=None, domain=None):
-    d = deepcopy(collection)
-    for k, v in d.items():
+    # Copy each model dict and its arguments rather than the full template,
+    # which may be read-only and holds model functions that aren't copied
+    d = {}
+    for k, v in collection.items():
+        v = {arg: copy(val) for arg, val in v.items()}
         if regen_mode:
             v['regen_mode'] = regen_mode
         if domain:
             v['domain'] = domain
+        d[k] = v
     return d
 
 
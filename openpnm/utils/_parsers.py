@@ -10,6 +10,11 @@ __all__ = [
 ]
 
 
+# Accepted spellings of each element, see parse_element
+_elements = {'pore': 'pore', 'pores': 'pore',
+             'throat': 'throat', 'throats': 'throat'}
+
+
 def parse_indices(obj, indices):
     r"""
     Accepts a list of pores or throats and returns a properly structured
@@ -28,17 +33,14 @@ def parse_indices(obj, indices):
     """
     if indices is None:
         indices = np.array([], ndmin=1, dtype=int)
-    locs = np.array(indices, ndmin=1)
+    locs = np.atleast_1d(np.asarray(indices))
     # If boolean array, convert to indices
     if locs.dtype == bool:
-        if np.size(locs) == obj.Np:
-            locs = obj.Ps[locs]
-        elif np.size(locs) == obj.Nt:
-            locs = obj.Ts[locs]
-        else:
+        if np.size(locs) not in (obj.Np, obj.Nt):
             raise Exception('Mask of locations must be either '
                             + 'Np nor Nt long')
-    locs = locs.astype(dtype=int)
+        locs = np.flatnonzero(locs)
+    locs = locs.astype(dtype=int, copy=False)
     return locs
 
 
@@ -67,17 +69,16 @@ def parse_element(obj, element, single=False):
     # Convert element to a list for subsequent processing
     if isinstance(element, str):
         element = [element]
-    # Convert 'pore.prop' and 'throat.prop' into just 'pore' and 'throat'
-    element = [item.split('.', 1)[0] for item in element]
-    # Make sure all are lowercase
-    element = [item.lower() for item in element]
-    # Deal with an plurals
-    element = [item.rsplit('s', maxsplit=1)[0] for item in element]
+    # Convert 'pore.prop' and 'throat.prop' into just 'pore' and 'throat',
+    # dealing with case and plurals, and remove duplicates in a single pass
+    parsed = []
     for item in element:
-        if item not in ['pore', 'throat']:
+        item = _elements.get(item.split('.', 1)[0].lower())
+        if item is None:
             raise Exception('All keys must start with either pore or throat')
-    # Remove duplicates if any
-    _ = [element.remove(L) for L in element if element.count(L) > 1]
+        if item not in parsed:
+            parsed.append(item)
+    element = parsed
     if single:
         if len(element) > 1:
             raise Exception('Both elements recieved when single element '
@@ -106,6 +107,9 @@ def parse_labels(obj, labels, element):
         raise Exception('Labels cannot be None')
     if isinstance(labels, str):
         labels = [labels]
+    # Fetch existing labels once for use by all wildcards
+    if any('*' in label for label in labels):
+        Ls = [L.split('.', 1)[-1] for L in obj.labels(element=element)]
     # Parse the labels list
     parsed_labels = []
     for label in labels:
@@ -114,20 +118,21 @@ def parse_labels(obj, labels, element):
             label = label.split('.', 1)[-1]
         # Deal with wildcards
         if '*' in label:
-            Ls = [L.split('.', 1)[-1] for L in obj.labels(element=element)]
-            if label.startswith('*'):
-                temp = [L for L in Ls if L.endswith(label.strip('*'))]
-            if label.endswith('*'):
-                temp = [L for L in Ls if L.startswith(label.strip('*'))]
+            stem = label.strip('*')
+            if label.startswith('*') and label.endswith('*'):
+                temp = [L for L in Ls if stem in L]
+            elif label.startswith('*'):
+                temp = [L for L in Ls if L.endswith(stem)]
+            else:
+                temp = [L for L in Ls if L.startswith(stem)]
             temp = [element+'.'+L for L in temp]
         elif element+'.'+label in obj.keys():
             temp = [element+'.'+label]
         else:
             temp = [element+'.'+label]
         parsed_labels.extend(temp)
-        # Remove duplicates if any
-        _ = [parsed_labels.remove(L) for L in parsed_labels
-             if parsed_labels.count(L) > 1]
+    # Remove duplicates if any, preserving order
+    parsed_labels = list(dict.fromkeys(parsed_labels))
     return parsed_labels
 
 
@@ -161,8 +166,8 @@ def parse_mode(obj, mode, allowed=None, single=False):
         if (allowed is not None) and (item not in allowed):
             raise Exception('\'mode\' must be one of the following: '
                             + allowed.__str__())
-    # Remove duplicates, if any
-    _ = [mode.remove(L) for L in mode if mode.count(L) > 1]
+    # Remove duplicates, if any, preserving order
+    mode = list(dict.fromkeys(mode))
     if single:
         if len(mode) > 1:
             raise Exception('Multiple modes received when only one mode '
@@ -118,6 +118,64 @@ class TransportTest:
         # Revert back changes to objects
         self.setup_class()
 
+    def test_skip_rebuild_when_clean(self):
+        alg = op.algorithms.Transport(network=self.net, phase=self.phase)
+        alg.settings['conductance'] = 'throat.diffusive_conductance'
+        alg.settings['quantity'] = 'pore.mole_fraction'
+        alg.set_value_BC(pores=self.net.pores('top'), values=1)
+        alg.set_value_BC(pores=self.net.pores('bottom'), values=0)
+        assert alg._dirty
+        alg.run()
+        assert not alg._dirty
+        A = alg.A
+        alg.run()
+        # Nothing changed, so A is not rebuilt after the solve
+        assert alg._dirty is False
+        alg.set_value_BC(pores=self.net.pores('left'), values=0.5,
+                         mode='overwrite')
+        assert alg._dirty
+        alg.run()
+        assert alg.A is not A
+
+    def test_eliminate_bc_zeros(self):
+        alg = op.algorithms.Transport(network=self.net, phase=self.phase)
+        alg.settings['conductance'] = 'throat.diffusive_conductance'
+        alg.settings['quantity'] = 'pore.mole_fraction'
+        alg.set_value_BC(pores=self.net.pores('top'), values=1)
+        alg.set_value_BC(pores=self.net.pores('bottom'), values=0)
+        alg.run()
+        x = alg['pore.mole_fraction'].copy()
+        nnz = alg.A.nnz
+        alg.settings['eliminate_bc_zeros'] = True
+        alg.run()
+        assert alg.A.nnz < nnz
+        np.testing.assert_allclose(alg['pore.mole_fraction'], x)
+
+    def test_bc_masks_follow_bc_arrays(self):
+        alg = op.algorithms.Transport(network=self.net, phase=self.phase)
+        top, bottom = self.net.pores('top'), self.net.pores('bottom')
+        alg.set_value_BC(pores=top, values=1)
+        alg.set_rate_BC(pores=bottom, rates=1)
+        assert np.all(alg._bc_value_mask == np.isfinite(alg['pore.bc.value']))
+        assert np.all(alg._bc_rate_mask == np.isfinite(alg['pore.bc.rate']))
+        alg.clear_value_BCs()
+        assert not alg._bc_value_mask.any()
+        alg['pore.bc.rate'] = np.nan
+        assert not alg._bc_rate_mask.any()
+
+    def test_in_place_edit_of_bc_array(self):
+        alg = op.algorithms.Transport(network=self.net, phase=self.phase)
+        alg.settings['conductance'] = 'throat.diffusive_conductance'
+        alg.settings['quantity'] = 'pore.mole_fraction'
+        alg.set_value_BC(pores=self.net.pores('top'), values=1.0)
+        alg.run()
+        nt.assert_allclose(alg.x, 1.0)
+        # Editing the BC array in place must be picked up by the next solve
+        alg['pore.bc.value'][self.net.pores('bottom')] = 0.0
+        alg.run()
+        nt.assert_allclose(alg.x[self.net.pores('bottom')], 0.0)
+        nt.assert_allclose(alg.x[self.net.pores('top')], 1.0)
+
     def test_rate_single_pore(self):
         alg = op.algorithms.ReactiveTransport(network=self.net,
                                               phase=self.phase)
@@ -66,6 +66,13 @@ class IPTest:
         alg.apply_trapping()
         assert "pore.trapped" in alg.keys()
 
+    def test_is_in_clusters_matches_isin(self):
+        from openpnm._skgraph.simulations import is_in_clusters
+        labels = np.array([-1, 0, 3, 2, -1, 5, 3])
+        for clusters in [[], [3], [0, 5], [-1], [-1, 2], [7, -1, 0]]:
+            np.testing.assert_array_equal(is_in_clusters(labels, clusters),
+                                          np.isin(labels, clusters))
+
     def test_plot_pc_curve(self):
         alg = op.algorithms.InvasionPercolation(network=self.net, phase=self.water)
         alg.set_inlet_BC(pores=self.net.pores("top"))
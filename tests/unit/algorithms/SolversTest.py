@@ -20,7 +20,54 @@ class SolversTest:
         self.alg.settings._update({'quantity': 'pore.x',
                                    'conductance': 'throat.conductance'})
         self.alg.set_value_BC(pores=self.net.pores('front'), values=1.0)
-        self.alg.set_value_BC(pores=self.net.pores('bottom'), values=0.0)
+        self.alg.set_value_BC(pores=self.net.pores('back'), values=0.0)
+
+    def test_scipy_spsolve_symbolic_reuse(self):
+        solver = op.solvers.ScipySpsolve()
+        self.alg.run(solver=solver)
+        x = self.alg['pore.x'].copy()
+        sym = self.alg._symbolic
+        assert sym[0] is op.solvers.ScipySpsolve
+        # Second run must reuse the cached ordering and give same answer
+        self.alg.run(solver=solver)
+        assert self.alg._symbolic is sym
+        nt.assert_allclose(self.alg['pore.x'], x)
+        A, b = self.alg.A, self.alg.b
+        nt.assert_allclose(solver.solve(A, b)[0], x)
+
+    def test_scipy_spsolve_reuses_numeric_factor(self):
+        solver = op.solvers.ScipySpsolve()
+        A, b = self.alg.A, self.alg.b
+        sym = solver.symbolic_factor(A)
+        # The factorization done to find the ordering is used by solve
+        lu = solver._factor[2]
+        x1, _ = solver.solve(A, b, sym=sym)
+        assert solver._factor[2] is lu
+        nt.assert_allclose(A @ x1, b, atol=1e-10)
+        x2, _ = solver.solve(A.copy(), 2*b, sym=sym)
+        assert solver._factor[2] is lu
+        nt.assert_allclose(x2, 2*x1)
+        # Changing A must trigger a new numeric factorization
+        A2 = A.copy()
+        A2.data *= 2
+        x3, _ = solver.solve(A2, b, sym=sym)
+        assert solver._factor[2] is not lu
+        nt.assert_allclose(x3, x1/2)
+
+    def test_scipy_bicgstab_ilu_reuses_preconditioner(self):
+        self.alg.run(solver=op.solvers.ScipySpsolve())
+        x = self.alg['pore.x'].copy()
+        solver = op.solvers.ScipyBicgstabILU()
+        self.alg.run(solver=solver)
+        nt.assert_allclose(self.alg['pore.x'], x, rtol=1e-6)
+        M = solver._M
+        self.alg.run(solver=solver)
+        assert solver._M is M
+        # A materially different A must trigger a new preconditioner
+        A, b = self.alg.A.copy(), self.alg.b
+        A.data *= 2
+        solver.solve(A, b)
+        assert solver._M is not M
 
     # def test_solver_not_available(self):
     #     self.alg.settings['solver_family'] = 'not_supported_solver'
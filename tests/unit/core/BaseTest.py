@@ -393,6 +393,21 @@ class BaseTest:
         # assert 'pore._blah' not in self.net.props()
         assert 'pore._blah' in self.net.keys()
 
+    def test_props_after_adding_and_removing_props(self):
+        pn = op.network.Cubic(shape=[3, 3, 3])
+        a = pn.props()
+        a.append('pore.foo')
+        assert 'pore.foo' not in pn.props()
+        pn['pore.foo'] = 1.0
+        assert 'pore.foo' in pn.props(element='pore')
+        assert 'pore.foo' not in pn.props(element='throat')
+        pn['pore.foo'] = False
+        assert 'pore.foo' not in pn.props()
+        pn.update({'throat.bar': np.ones(pn.Nt)})
+        assert 'throat.bar' in pn.props()
+        del pn['throat.bar']
+        assert 'throat.bar' not in pn.props()
+
     def test_labels(self):
         a = self.net.labels()
         assert 'pore.top' in a
@@ -452,6 +467,18 @@ class BaseTest:
              'pore.left']
         assert sorted(a) == sorted(b)
 
+    def test_labels_on_pores_after_adding_and_removing_label(self):
+        pn = op.network.Cubic([3, 3, 3])
+        assert 'pore.foo' not in pn.labels(pores=[0, 1])
+        pn['pore.foo'] = True
+        assert 'pore.foo' in pn.labels(pores=[0, 1])
+        del pn['pore.foo']
+        assert 'pore.foo' not in pn.labels(pores=[0, 1])
+        pn.set_label(label='bar', pores=[0])
+        assert 'pore.bar' in pn.labels(pores=[0, 1])
+        pn.set_label(label='bar', mode='purge')
+        assert 'pore.bar' not in pn.labels(pores=[0, 1])
+
     def test_labels_pores_mode_or(self):
         a = self.net.labels(pores=[0, 1, 2], mode='or')
         b = ['pore.all', 'pore.bottom', 'pore.front',
@@ -909,6 +936,31 @@ class BaseTest:
         pn.set_label(label='tester', throats=[1, 2, 3], mode='remove')
         assert pn['throat.tester'].sum() == 0
 
+    def test_set_label_with_boolean_mask(self):
+        pn = op.network.Cubic(shape=[5, 5, 5])
+        mask = np.zeros(pn.Np, dtype=bool)
+        mask[[1, 2]] = True
+        pn.set_label(label='tester', pores=mask)
+        assert pn['pore.tester'].sum() == 2
+        mask[[1, 2, 3]] = [False, True, True]
+        pn.set_label(label='tester', pores=mask)
+        assert pn['pore.tester'].sum() == 3
+        pn.set_label(label='tester', pores=mask, mode='remove')
+        assert np.all(pn.pores('tester') == [1])
+        pn.set_label(label='tester', pores=mask, mode='overwrite')
+        assert np.all(pn.pores('tester') == [2, 3])
+        mask[:] = False
+        assert pn['pore.tester'].sum() == 2
+
+    def test_num_pores_single_label_after_inplace_edit(self):
+        pn = op.network.Cubic(shape=[5, 5, 5])
+        assert pn.num_pores('left') == 25
+        assert pn.num_pores('pore.left') == 25
+        pn['pore.left'][:5] = False
+        assert pn.num_pores('left') == 20
+        assert pn.num_pores('left', mode='and') == 20
+        assert pn.num_throats('surface') == pn.throats('surface').size
+
     def test_set_label_purge_from_pores(self):
         pn = op.network.Cubic(shape=[5, 5, 5])
         pn.set_label(label='tester', pores=[1, 2])
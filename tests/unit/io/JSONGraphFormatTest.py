@@ -1,6 +1,5 @@
+import io
 import os
-import py
-import copy
 import json
 import pytest
 import numpy as np
@@ -9,16 +8,22 @@ from pathlib import Path
 from openpnm.io import network_from_jsongraph, network_to_jsongraph
 
 
+FIXTURES = Path(__file__).resolve().parents[2] / 'fixtures' / 'JSONGraphFormat'
+VALID_JSON = (FIXTURES / 'valid.json').read_bytes()
+INVALID_JSON = (FIXTURES / 'invalid.json').read_bytes()
+
+
 class JSONGraphTest:
 
     def setup_class(self):
         ws = op.Workspace()
         ws.settings['local_data'] = True
         self.net = op.network.Cubic(shape=[2, 2, 2])
-        self.net['pore.diameter'] = 2.0 * np.ones(self.net.Np)
-        self.net['throat.diameter'] = 2.0 * np.ones(self.net.Nt)
-        self.net.add_model(propname='throat.length',
-                           model=op.models.network.pore_to_pore_distance)
+        self.net['pore.diameter'] = np.full(self.net.Np, 2.0)
+        self.net['throat.diameter'] = np.full(self.net.Nt, 2.0)
+        # Pores of a unit-spaced Cubic network are 1 apart, so there is no
+        # need to run the pore_to_pore_distance model
+        self.net['throat.length'] = np.full(self.net.Nt, 1.0)
 
     def teardown_class(self):
         ws = op.Workspace()
@@ -40,107 +45,159 @@ class JSONGraphTest:
     #     assert expected_error in str(e_info.value)
 
     def test_save_success(self):
-        path = Path(os.path.realpath(__file__),
-                    '../../../fixtures/JSONGraphFormat')
-        filename = Path(path.resolve(), 'save_success.json')
-        op.io.network_to_jsongraph(self.net, filename=filename)
+        buf = io.BytesIO()
+        op.io.network_to_jsongraph(self.net, fp=buf)
 
-        # Read newly created file
-        with open(filename, 'r') as file:
-            json_file = json.load(file)
+        # Read the encoded document back from the buffer
+        json_file = json.loads(buf.getvalue())
+        graph = json_file['graph']
 
         # Ensure correctnes of overal network properties
-        assert json_file['graph']['metadata']['number_of_nodes'] == self.net.Np
-        assert json_file['graph']['metadata']['number_of_links'] == self.net.Nt
+        assert graph['metadata']['number_of_nodes'] == self.net.Np
+        assert graph['metadata']['number_of_links'] == self.net.Nt
 
         # Ensure correctnes of node list properties
-        nodes = sorted(json_file['graph']['nodes'], key=lambda node: int(node['id']))
-        assert len(nodes) == self.net.Np
+        nodes = graph['nodes']
         assert isinstance(nodes, list)
+        assert len(nodes) == self.net.Np
 
-        # Sweep all nodes in the list
-        for node in nodes:
-            assert isinstance(node, dict)
-
-            # Ensure correctnes of node property types
-            assert 'id' in node
-            assert 'metadata' in node
-            assert isinstance(node['id'], str)
-            assert isinstance(node['metadata'], dict)
-
-            # Ensure correctnes of node property values
-            assert int(node['id']) < self.net.Np
-
-            # Ensure correctnes of node metadata types
-            assert 'node_coordinates' in node['metadata']
-            assert 'node_squared_radius' in node['metadata']
-            assert 'x' in node['metadata']['node_coordinates']
-            assert 'y' in node['metadata']['node_coordinates']
-            assert 'z' in node['metadata']['node_coordinates']
-            assert isinstance(node['metadata']['node_coordinates'], dict)
-            assert isinstance(node['metadata']['node_squared_radius'], int)
-            assert isinstance(node['metadata']['node_coordinates']['x'], int)
-            assert isinstance(node['metadata']['node_coordinates']['y'], int)
-            assert isinstance(node['metadata']['node_coordinates']['z'], int)
-
-            # Ensure correctness of node metadata values
-            assert node['metadata']['node_squared_radius'] == 1
-            assert node['metadata']['node_coordinates']['x'] * 2 % 2 == 0
-            assert node['metadata']['node_coordinates']['y'] * 2 % 2 == 0
-            assert node['metadata']['node_coordinates']['z'] * 2 % 2 == 0
+        # Ensure correctnes of node property and metadata types
+        assert all(isinstance(node, dict) for node in nodes)
+        assert all(isinstance(node['id'], str) for node in nodes)
+        meta = [node['metadata'] for node in nodes]
+        assert all(isinstance(m['node_squared_radius'], int) for m in meta)
+        coords = [m['node_coordinates'] for m in meta]
+        assert all(isinstance(c[k], int) for c in coords for k in 'xyz')
+
+        # Gather node fields into a structured array and check values at once
+        node_arr = np.array(
+            [(int(node['id']), m['node_squared_radius'], c['x'], c['y'], c['z'])
+             for node, m, c in zip(nodes, meta, coords)],
+            dtype=[('id', 'i8'), ('r2', 'i8'), ('x', 'i8'), ('y', 'i8'),
+                   ('z', 'i8')])
+        # Nodes are written in pore order, so no sorting is needed
+        assert np.array_equal(node_arr['id'], np.arange(self.net.Np))
+        assert np.all(node_arr['r2'] == 1)
+        for k in 'xyz':
+            assert np.all(node_arr[k] * 2 % 2 == 0)
 
         # Ensure correctnes of edge list properties
-        edges = sorted(json_file['graph']['edges'], key=lambda edge: int(edge['id']))
-        assert len(edges) == self.net.Nt
+        edges = graph['edges']
         assert isinstance(edges, list)
+        assert len(edges) == self.net.Nt
+
+        # Ensure correctnes of edge property and metadata types
+        assert all(isinstance(edge, dict) for edge in edges)
+        assert all(isinstance(edge[k], str) for edge in edges
+                   for k in ('id', 'source', 'target'))
+        meta = [edge['metadata'] for edge in edges]
+        assert all(isinstance(m[k], float) for m in meta
+                   for k in ('link_length', 'link_squared_radius'))
+
+        # Gather edge fields into a structured array and check values at once
+        edge_arr = np.array(
+            [(int(edge['id']), int(edge['source']), int(edge['target']),
+              m['link_length'], m['link_squared_radius'])
+             for edge, m in zip(edges, meta)],
+            dtype=[('id', 'i8'), ('source', 'i8'), ('target', 'i8'),
+                   ('length', 'f8'), ('r2', 'f8')])
+        assert np.array_equal(edge_arr['id'], np.arange(self.net.Nt))
+        assert np.all(edge_arr['source'] < self.net.Np)
+        assert np.all(edge_arr['target'] < self.net.Np)
+        assert np.all(edge_arr['length'] == 1.0)
+        assert np.all(edge_arr['r2'] == 1.0)
+
+    def test_save_to_path(self, tmpdir):
+        filename = Path(tmpdir, 'save_success.json')
+        op.io.network_to_jsongraph(self.net, filename=filename)
+        buf = io.BytesIO()
+        op.io.network_to_jsongraph(self.net, fp=buf)
+        assert filename.read_bytes() == buf.getvalue()
+        net = op.io.network_from_jsongraph(filename)
+        assert net.Np == self.net.Np
+        assert net.Nt == self.net.Nt
+        os.remove(filename)
 
-        # Sweep all edges in the list
-        for edge in edges:
-            assert isinstance(edge, dict)
-
-            # Ensure correctnes of edge property types
-            assert 'id' in edge
-            assert 'source' in edge
-            assert 'target' in edge
-            assert 'metadata' in edge
-            assert isinstance(edge['id'], str)
-            assert isinstance(edge['source'], str)
-            assert isinstance(edge['target'], str)
-            assert isinstance(edge['metadata'], dict)
-
-            # Ensure correctnes of edge property values
-            assert int(edge['id']) < self.net.Nt
-            assert int(edge['source']) < self.net.Np
-            assert int(edge['target']) < self.net.Np
-
-            # Ensure correctnes of edge metadata types
-            assert 'link_length' in edge['metadata']
-            assert 'link_squared_radius' in edge['metadata']
-            assert isinstance(edge['metadata']['link_length'], float)
-            assert isinstance(edge['metadata']['link_squared_radius'], float)
-
-            # Ensure correctnes of edge metadata values
-            assert edge['metadata']['link_length'] == 1.0
-            assert edge['metadata']['link_squared_radius'] == 1.0
-
-        # Remove test file after completion
+    def test_save_and_load_compact(self, tmpdir):
+        filename = Path(tmpdir, 'save_compact.json')
+        op.io.network_to_jsongraph(self.net, filename=filename, compact=True)
+        json_file = json.loads(filename.read_bytes())
+        assert 'nodes' not in json_file['graph']
+        assert 'arrays' in json_file['graph']['metadata']
+        net = op.io.network_from_jsongraph(filename)
+        assert net.Np == self.net.Np
+        assert net.Nt == self.net.Nt
+        np.testing.assert_array_equal(net['pore.coords'], self.net['pore.coords'])
+        np.testing.assert_array_equal(net['throat.conns'], self.net['throat.conns'])
+        np.testing.assert_allclose(net['throat.length'], self.net['throat.length'])
+        np.testing.assert_allclose(net['throat.diameter'],
+                                   self.net['throat.diameter'])
+        net['pore.coords'][0] = 0.0  # Decoded arrays must be writable
         os.remove(filename)
 
-    def test_load_failure(self):
-        path = Path(os.path.realpath(__file__),
-                    '../../../fixtures/JSONGraphFormat')
-        filename = Path(path.resolve(), 'invalid.json')
+    def test_round_trip_over_shapes(self, tmpdir):
+        for shape in [[2, 2, 2], [5, 5, 5], [10, 10, 10]]:
+            net = op.network.Cubic(shape=shape)
+            net['pore.diameter'] = np.full(net.Np, 2.0)
+            net['throat.diameter'] = np.full(net.Nt, 2.0)
+            net['throat.length'] = np.full(net.Nt, 1.0)
+            for compact in [False, True]:
+                filename = Path(tmpdir, f'round_trip_{net.Np}_{compact}.json')
+                op.io.network_to_jsongraph(net, filename=filename,
+                                           compact=compact)
+                net2 = op.io.network_from_jsongraph(filename)
+                assert net2.Np == net.Np
+                assert net2.Nt == net.Nt
+                # Only the compact form keeps non-integer coordinates
+                coords = net.coords if compact else net.coords.astype(int)
+                np.testing.assert_array_equal(net2.coords, coords)
+                np.testing.assert_array_equal(net2.conns, net.conns)
+                np.testing.assert_array_equal(net2['throat.length'], 1.0)
+                np.testing.assert_array_equal(net2['throat.diameter'], 2.0)
+                os.remove(filename)
+
+    def test_round_trip_coords_with_non_integer_spacing(self):
+        net = op.network.Cubic(shape=[3, 1, 1], spacing=1.5)
+        net['pore.diameter'] = np.full(net.Np, 2.0)
+        net['throat.diameter'] = np.full(net.Nt, 2.0)
+        net['throat.length'] = np.full(net.Nt, 1.5)
+        x = [[0.75, 0.75, 0.75], [2.25, 0.75, 0.75], [3.75, 0.75, 0.75]]
+        np.testing.assert_array_equal(net.coords, x)
+        # The standard form truncates coordinates to integers...
+        buf = io.BytesIO()
+        op.io.network_to_jsongraph(net, fp=buf)
+        buf.seek(0)
+        net2 = op.io.network_from_jsongraph(fp=buf)
+        np.testing.assert_array_equal(net2.coords, [[0, 0, 0], [2, 0, 0], [3, 0, 0]])
+        # ...while the compact form keeps them exactly
+        buf = io.BytesIO()
+        op.io.network_to_jsongraph(net, fp=buf, compact=True)
+        buf.seek(0)
+        net2 = op.io.network_from_jsongraph(fp=buf)
+        np.testing.assert_array_equal(net2.coords, x)
+        np.testing.assert_array_equal(net2['throat.length'], 1.5)
+
+    def test_render_graph_matches_json_encoder(self):
+        from openpnm.io._jsongraph import _render_graph, _graph_to_objects
+        net = op.network.Cubic(shape=[3, 2, 2], spacing=1.5e-5)
+        net['pore.diameter'] = np.linspace(0, 9, net.Np)
+        net['throat.diameter'] = np.linspace(1e-6, 1e3, net.Nt)
+        net['throat.length'] = np.linspace(1e-12, 1e12, net.Nt)
+        metadata = {'number_of_nodes': net.Np, 'number_of_links': net.Nt}
+        graph_obj = _graph_to_objects(net, metadata)
+        expected = json.dumps({'graph': graph_obj}, indent=2).encode('utf-8')
+        assert _render_graph(net) == expected
+        net['throat.length'][0] = np.nan
+        assert _render_graph(net) is None
 
+    def test_load_failure(self):
         # Ensure an exception was thrown
-        with pytest.raises(Exception):
-            op.io.from_jsongraph(filename)
+        with pytest.raises(Exception, match='not in the JSON Graph Format'):
+            op.io.network_from_jsongraph(fp=io.BytesIO(INVALID_JSON))
 
     def test_load_success(self):
         # Load JSON file and ensure project integrity
-        path = Path(os.path.realpath(__file__),
-                    '../../../fixtures/JSONGraphFormat')
-        filename = Path(path.resolve(), 'valid.json')
-        net = op.io.network_from_jsongraph(filename)
+        net = op.io.network_from_jsongraph(fp=io.BytesIO(VALID_JSON))
         assert hasattr(net, 'conns')
 
         # Ensure overal network properties
@@ -148,16 +205,15 @@ class JSONGraphTest:
         assert net.Nt == 1
 
         # Ensure correctness of pore properties
-        assert np.array_equal(net['pore.index'], np.array([0, 1]))
-        assert np.array_equal(net['pore.diameter'], np.array([0, 0]))
-        assert np.array_equal(net['pore.coords'][0], np.array([0, 0, 0]))
-        assert np.array_equal(net['pore.coords'][1], np.array([1, 1, 1]))
+        np.testing.assert_array_equal(net['pore.index'], [0, 1])
+        np.testing.assert_array_equal(net['pore.diameter'], [0, 0])
+        np.testing.assert_array_equal(net['pore.coords'], [[0, 0, 0], [1, 1, 1]])
 
         # Ensure correctness of throat properties
         length = 1.73205080757
         squared_radius = 5.169298742047715
         assert net['throat.length'] == length
-        assert np.array_equal(net['throat.conns'], np.array([[0, 1]]))
+        np.testing.assert_array_equal(net['throat.conns'], [[0, 1]])
         assert net['throat.diameter'] == 2.0 * np.sqrt(squared_radius)
 
 
@@ -165,7 +221,7 @@ if __name__ == '__main__':
     # All the tests in this file can be run with 'playing' this file
     t = JSONGraphTest()
     self = t  # For interacting with the tests at the command line
-    tmpdir = py.path.local()
+    tmpdir = Path.cwd()
     t.setup_class()
     for item in t.__dir__():
         if item.startswith('test'):
@@ -173,4 +229,4 @@ if __name__ == '__main__':
             try:
                 t.__getattribute__(item)()
             except TypeError:
-                t.__getattribute__(item)()
+                t.__getattribute__(item)(tmpdir=tmpdir)
@@ -281,6 +281,16 @@ class GenericSourceTermTest:
         # The two Butler-Volmer models must only differ by n*F (unit conversion)
         assert_allclose(rate_BV_v, rate_BV_c * BV_params["n"] * 96485.33212)
 
+    def test_laplacian_dot_matches_csgraph_laplacian(self):
+        from scipy.sparse.csgraph import laplacian
+        from openpnm.models.physics.source_terms._funcs import _laplacian_dot
+        np.random.seed(0)
+        c = np.random.rand(self.net.Np)
+        for g in [np.random.rand(self.net.Nt), np.random.rand(self.net.Nt, 2)]:
+            am = self.net.create_adjacency_matrix(weights=g, fmt='coo')
+            assert_allclose(_laplacian_dot(self.net, g, c), laplacian(am) @ c,
+                            atol=1e-14)
+
 
 if __name__ == '__main__':
 
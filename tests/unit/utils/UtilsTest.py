@@ -115,6 +115,18 @@ class UtilsTest:
         assert not op.utils.is_valid_propname("throat.")
         assert not op.utils.is_valid_propname("pore.foo..bar")
 
+    def test_get_model_collection_does_not_alter_template(self):
+        f = op.models.collections.geometry.spheres_and_cylinders
+        c = f(regen_mode='deferred', domain='pore.left')
+        assert c['pore.seed']['domain'] == 'pore.left'
+        c['pore.seed']['num_range'].append(1.0)
+        c['pore.diameter']['props'][0] = 'pore.foo'
+        c2 = f()
+        assert c2['pore.seed']['num_range'] == [0.2, 0.7]
+        assert c2['pore.diameter']['props'][0] == 'pore.max_size'
+        assert 'domain' not in c2['pore.seed']
+        assert c2['pore.seed']['model'] is c['pore.seed']['model']
+
 
 if __name__ == '__main__':
 